@@ -21,11 +21,13 @@ Options:
     -i, --input-dir    Directory containing the extracted contents of Google Photos Takeout
     -o, --output-dir   Directory into which the processed output will be written
     -e, --error-dir    Directory for any files that have errors during processing
-    -p, --parallel     Number of parallel processes to use (default: 1)
+    -p, --parallel     Number of parallel worker threads to use (default: 4 per CPU, max 32)
     -d, --debug        Copy files without date updates to error directory for inspection
     -q, --quiet        Reduce verbosity of output messages
-    -u, --force-utc    Force UTC timezone for all timestamps
+    -u, --force-utc    Show the sample dates in the summary in UTC instead of local time
     -s, --single-file  Process only a single file (for debugging purposes)
+    --link             Hardlink instead of copy when on the same drive (also changes source dates,
+                       and GPS/descriptions are not written to linked files)
 
 Requirements:
     - Python 3.6+
@@ -35,13 +37,22 @@ Requirements:
 import os
 import sys
 import json
+import re
 import shutil
+import errno
 import argparse
-import tempfile
+import atexit
+import bisect
 import subprocess
 import concurrent.futures
+import functools
+import itertools
+import operator
 import threading
-from datetime import datetime
+import time
+import queue
+import struct
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any, Counter
 from collections import Counter
@@ -49,7 +60,6 @@ from collections import Counter
 # For EXIF handling
 try:
     from PIL import Image
-    from PIL.ExifTags import TAGS, GPSTAGS
     # Increase the maximum image size limit to handle large photos
     # This prevents DecompressionBombWarning for large images
     Image.MAX_IMAGE_PIXELS = 933120000  # Increased from default ~89 million to ~933 million
@@ -59,6 +69,44 @@ except ImportError:
     print("Warning: Pillow library not found. GPS data handling will be disabled.")
     print("To enable GPS data handling, install Pillow: pip install Pillow")
 
+# exiftool is used to write EXIF metadata when it is installed (optional)
+EXIFTOOL_PATH = shutil.which('exiftool')
+
+# Numeric EXIF tag IDs for the image description, the GPS sub-IFD and the fields read from it
+IMAGE_DESCRIPTION_TAG = 0x010E
+GPS_IFD_TAG = 0x8825
+GPS_LATITUDE_REF = 1
+GPS_LATITUDE = 2
+GPS_LONGITUDE_REF = 3
+GPS_LONGITUDE = 4
+
+# Largest EXIF block a JPEG APP1 segment can hold, its length field is 16 bits
+MAX_EXIF_SEGMENT_SIZE = 65533
+
+_INV60 = 1 / 60.0
+_INV3600 = 1 / 3600.0
+
+# In-place EXIF rewriting for JPEGs when exiftool is not installed (optional)
+try:
+    import piexif
+    import piexif.helper
+    HAS_PIEXIF = True
+except ImportError:
+    HAS_PIEXIF = False
+
+# Faster JSON parsing for metadata files (optional)
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Matches the photoTakenTime block as Google Takeout writes it, so the timestamp can be
+# read straight from the raw bytes without building the whole metadata dict
+PHOTO_TAKEN_TIME_RE = re.compile(
+    rb'"photoTakenTime"\s*:\s*\{\s*"timestamp"\s*:\s*"(-?\d+)"\s*,\s*"formatted"\s*:\s*"([^"\\]*)"\s*\}'
+)
+
 # Check if running on Windows
 import platform
 IS_WINDOWS = platform.system() == "Windows"
@@ -95,66 +143,213 @@ class Colors:
         BOLD = ''
         UNDERLINE = ''
 
+# Opening a file to set its dates is retried a few times on these Windows errors,
+# which other programs briefly holding the file cause (access denied, sharing and
+# lock violations)
+WINDOWS_DATE_RETRIES = 3
+WINDOWS_RETRY_ERRORS = frozenset({5, 32, 33})
+
 # Check for required dependencies
 if IS_WINDOWS:
     try:
+        import win32con
         import win32file
+        import pywintypes
     except ImportError:
         print("Error: pywin32 is required for Windows file date handling.")
         print("Please install it with: pip install pywin32")
         sys.exit(1)
 
+# Default number of worker threads; the per-file work is I/O-bound so threads are cheap
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# Worker threads used when the input is on a spinning disk, where parallel reads
+# make the drive head seek back and forth between files
+HDD_WORKERS = 4
+
+# Most media files handed to a worker in one task. Batching keeps the executor's
+# per-task bookkeeping (creating a future, waiting on the in-flight window) off the
+# per-file path, which matters once a Takeout has tens of thousands of small files
+MAX_CHUNK_SIZE = 16
+
+# Result flags counted for the processing summary, tallied per batch by process_file_chunk
+RESULT_COUNTERS = ('dates_updated', 'is_companion', 'date_not_updated', 'gps_updated', 'no_gps_metadata', 'description_updated')
+
+# Linux ioctl that clones a file's extents (copy-on-write reflink on btrfs/XFS)
+FICLONE = 0x40049409
+# Whether reflinks and in-kernel copies with os.copy_file_range (Linux, Python 3.8+)
+# can work at all; cleared only when the platform itself lacks them
+_reflink_supported = sys.platform.startswith('linux')
+_copy_file_range_supported = hasattr(os, 'copy_file_range')
+# (source device, destination device) pairs where the filesystems rejected a reflink
+# or copy_file_range, so other drives (like an error directory elsewhere) keep the
+# fast paths
+_reflink_unsupported_devices = set()
+_copy_file_range_unsupported_devices = set()
+
+# Supported media file extensions (all lowercase for case-insensitive comparison)
+MEDIA_EXTENSIONS = frozenset({
+    '.jpg', '.jpeg', '.png', '.gif', '.heic', '.mp4', '.mov', 
+    '.avi', '.mkv', '.nef', '.dng', '.raw', '.cr2', '.cr3', 
+    '.arw', '.orf', '.rw2', '.pef', '.raf'
+})
+
+# Directories already created during this run (see ensure_dir)
+_created_dirs = set()
+
+# Photo taken times already read, by sidecar path (see read_photo_taken_ts). A Live
+# Photo's sidecar is read by the companion pass and again for both halves of the pair.
+# Files are processed directory by directory, so when the cache fills up it is simply
+# emptied, the entries still being reused are the recent ones
+PHOTO_TAKEN_CACHE_SIZE = 65536
+_photo_taken_cache = {}
+
+# Each input directory's path relative to the input root, worked out once per
+# directory rather than with a relpath call for every file (see relative_dir)
+_relative_dirs = {}
+
+# Progress bar redraws are limited to about 10 per second, writing to the terminal
+# on every completed file makes the terminal itself the bottleneck on fast drives
+PROGRESS_INTERVAL = 0.1
+PROGRESS_BAR_LENGTH = 50
+_PROGRESS_FULL = '█' * PROGRESS_BAR_LENGTH
+_PROGRESS_EMPTY = '-' * PROGRESS_BAR_LENGTH
+_last_progress_time = [0.0]
+# The colors are fixed once Colors is defined, so the progress line template is built once
+_PROGRESS_FORMAT = (f'\r{Colors.BOLD}Progress:{Colors.ENDC} |{Colors.CYAN}%s{Colors.ENDC}| %.1f%% '
+                    f'{Colors.BOLD}%d/%d{Colors.ENDC}')
+
+# Sidecars are read with a single raw read of up to this many bytes (see read_file_bytes)
+JSON_READ_SIZE = 65536
+
+# Directory listings kept for the Live Photo fallbacks in process_media_file (see
+# dir_index). Files are processed directory by directory, so only the folders
+# currently in flight need to stay cached
+DIR_INDEX_CACHE_SIZE = 64
+
+# Sidecar suffixes appended to the full media file name, in lookup order; the
+# extensionless file.json form is tried after them (see find_json_sidecar)
+JSON_SIDECAR_SUFFIXES = ('.json', '.suppl.json', '.supplemental-metadata.json')
+
 # Define image file extensions for GPS processing
-IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.tiff', '.tif'}  # Note: HEIC requires additional libraries
+IMAGE_EXTENSIONS = frozenset({'.jpg', '.jpeg', '.tiff', '.tif'})  # Note: HEIC requires additional libraries
+
+
+def parse_json(data: bytes) -> Any:
+    """Parse raw JSON bytes, using orjson when it is installed."""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
-def get_gps_from_exif(image_path: str) -> Optional[Tuple[float, float]]:
+def read_file_bytes(path: str) -> bytes:
+    """Read a small file's bytes with raw OS reads, skipping Python's buffered file objects."""
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        # One read covers nearly every sidecar, larger files are read in further chunks
+        data = os.read(fd, JSON_READ_SIZE)
+        if len(data) < JSON_READ_SIZE:
+            return data
+        chunks = [data]
+        while True:
+            data = os.read(fd, JSON_READ_SIZE)
+            if not data:
+                return b''.join(chunks)
+            chunks.append(data)
+    finally:
+        os.close(fd)
+
+
+def load_json_file(json_path: str) -> Any:
+    """Read and parse a JSON metadata file."""
+    # Read raw bytes; both parsers decode UTF-8 themselves
+    return parse_json(read_file_bytes(json_path))
+
+
+def dms_to_degrees(value) -> float:
+    """Convert an EXIF (degrees, minutes, seconds) triple to decimal degrees."""
+    d, m, s = value
+    return float(d) + float(m) * _INV60 + float(s) * _INV3600
+
+
+def read_exif(image_path: str) -> Tuple[Optional[Tuple[float, float]], Optional[str]]:
     """
-    Extract GPS coordinates from image EXIF data.
-    Returns a tuple of (latitude, longitude) or None if no GPS data is found.
+    Read the GPS coordinates and the description from image EXIF data in one pass.
+    Returns a tuple of ((latitude, longitude), description), either part is None if missing.
     """
     if not HAS_PIL:
-        return None
+        return None, None
+    
+    # Only formats with standard EXIF are opened, so Pillow never has to dispatch a
+    # decoder for PNG/GIF/HEIC or RAW files passed in by mistake
+    extension = os.path.splitext(image_path)[1].lower()
+    if extension not in IMAGE_EXTENSIONS:
+        return None, None
+    
+    # For JPEGs piexif reads only the EXIF segment and parses it several times faster
+    # than Pillow; files it can't parse fall through to Pillow
+    if HAS_PIEXIF and extension in ('.jpg', '.jpeg'):
+        try:
+            exif_dict = piexif.load(image_path)
+            gps_info = gps_ifd_from_piexif(exif_dict['GPS'])
+            description = exif_dict['0th'].get(IMAGE_DESCRIPTION_TAG)
+            if isinstance(description, bytes):
+                # Decode the same way Pillow does for ASCII tags
+                description = description.decode('latin-1', 'replace')
+            if not isinstance(description, str) or not description.strip():
+                description = None
+            return gps_from_exif_ifd(gps_info), description
+        except Exception:
+            pass
     
     try:
-        # Open the image
-        img = Image.open(image_path)
-        
-        # Check if the image has EXIF data
-        if not hasattr(img, '_getexif') or img._getexif() is None:
-            return None
-        
-        # Extract EXIF data
-        exif_data = {
-            TAGS.get(tag, tag): value
-            for tag, value in img._getexif().items()
-        }
-        
-        # Check if GPS info exists
-        if 'GPSInfo' not in exif_data:
-            return None
-        
-        # Parse GPS data
-        gps_info = {
-            GPSTAGS.get(tag, tag): value
-            for tag, value in exif_data['GPSInfo'].items()
-        }
-        
+        # Open the image lazily; only the EXIF header is parsed, pixel data is never decoded.
+        # Read the tags by their numeric IDs instead of naming every EXIF tag
+        with Image.open(image_path) as img:
+            exif = img.getexif()
+            gps_info = exif.get_ifd(GPS_IFD_TAG)
+            description = exif.get(IMAGE_DESCRIPTION_TAG)
+    except Exception as e:
+        # print(f"Error reading EXIF data: {e}")
+        return None, None
+    
+    if not isinstance(description, str) or not description.strip():
+        description = None
+    return gps_from_exif_ifd(gps_info), description
+
+
+def gps_ifd_from_piexif(gps: Dict[int, Any]) -> Dict[int, Any]:
+    """
+    Convert a piexif GPS IFD to the value types Pillow returns, so gps_from_exif_ifd
+    can read either: references as strings and rationals as floats.
+    """
+    gps_info = {}
+    for tag in (GPS_LATITUDE_REF, GPS_LONGITUDE_REF):
+        if tag in gps:
+            gps_info[tag] = gps[tag].decode('latin-1', 'replace')
+    for tag in (GPS_LATITUDE, GPS_LONGITUDE):
+        if tag in gps:
+            # A zero denominator reads as NaN, like Pillow's IFDRational
+            gps_info[tag] = tuple(num / den if den else float('nan') for num, den in gps[tag])
+    return gps_info
+
+
+def gps_from_exif_ifd(gps_info: Dict[int, Any]) -> Optional[Tuple[float, float]]:
+    """
+    Extract GPS coordinates from an EXIF GPS sub-IFD.
+    Returns a tuple of (latitude, longitude) or None if no GPS data is found.
+    """
+    try:
         # Check if we have the required GPS data
-        if 'GPSLatitude' not in gps_info or 'GPSLongitude' not in gps_info:
+        if GPS_LATITUDE not in gps_info or GPS_LONGITUDE not in gps_info:
             return None
         
         # Check for reference directions (N/S, E/W)
-        lat_ref = gps_info.get('GPSLatitudeRef', 'N')
-        lon_ref = gps_info.get('GPSLongitudeRef', 'E')
+        lat_ref = gps_info.get(GPS_LATITUDE_REF, 'N')
+        lon_ref = gps_info.get(GPS_LONGITUDE_REF, 'E')
         
         # Convert coordinates to decimal degrees
-        def convert_to_degrees(value):
-            d, m, s = value
-            return d + (m / 60.0) + (s / 3600.0)
-        
-        latitude = convert_to_degrees(gps_info['GPSLatitude'])
-        longitude = convert_to_degrees(gps_info['GPSLongitude'])
+        latitude = dms_to_degrees(gps_info[GPS_LATITUDE])
+        longitude = dms_to_degrees(gps_info[GPS_LONGITUDE])
         
         # Apply reference direction
         if lat_ref == 'S':
@@ -170,74 +365,58 @@ def get_gps_from_exif(image_path: str) -> Optional[Tuple[float, float]]:
     except Exception as e:
         # print(f"Error extracting GPS data from EXIF: {e}")
         return None
-    finally:
-        if 'img' in locals():
-            img.close()
 
 
-def get_description_from_json(json_path: str) -> Optional[str]:
+def get_description_from_json(metadata: Dict[str, Any], filename: Optional[str] = None) -> Optional[str]:
     """
-    Extract description from Google Takeout JSON metadata.
+    Extract the user's description from parsed Google Takeout JSON metadata.
     Returns the description string or None if no description is found.
+    Takeout fills in the title with the file name, so a description that only
+    repeats the file name is ignored and the title is never used.
     """
-    if not json_path:
+    if not metadata:
         return None
     
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
-        
-        # Check for description in the metadata
-        if 'description' in metadata and metadata['description']:
-            return metadata['description']
+        description = metadata.get('description')
+        if not isinstance(description, str) or not description.strip():
+            return None
         
-        # Alternative fields that might contain description
-        if 'title' in metadata and metadata['title']:
-            return metadata['title']
+        # Nothing worth rewriting the image for if it is just the file name again
+        if description.strip() in (metadata.get('title'), filename):
+            return None
         
-        return None
+        return description
     except Exception as e:
         # print(f"Error extracting description from JSON: {e}")
         return None
 
 
-def get_gps_from_json(json_path: str) -> Optional[Tuple[float, float]]:
+def get_gps_from_json(metadata: Dict[str, Any]) -> Optional[Tuple[float, float]]:
     """
-    Extract GPS coordinates from Google Takeout JSON metadata.
+    Extract GPS coordinates from parsed Google Takeout JSON metadata.
     Returns a tuple of (latitude, longitude) or None if no GPS data is found.
     Ignores coordinates of 0,0 as they are likely invalid.
     """
-    if not json_path:
+    if not metadata:
         return None
     
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
-        
-        # Check for GPS data in the metadata
-        if 'geoData' in metadata and 'latitude' in metadata['geoData'] and 'longitude' in metadata['geoData']:
-            latitude = float(metadata['geoData']['latitude'])
-            longitude = float(metadata['geoData']['longitude'])
-            
-            # Ignore coordinates of 0,0 as they are likely invalid
-            if latitude == 0 and longitude == 0:
-                return None
+        # Check for GPS data in the metadata, then the alternative location field
+        for key in ('geoData', 'geoDataExif'):
+            geo = metadata.get(key)
+            if not geo or 'latitude' not in geo or 'longitude' not in geo:
+                continue
             
-            # Validate coordinates (basic check)
-            if abs(latitude) <= 90 and abs(longitude) <= 180:
-                return (latitude, longitude)
-        
-        # Alternative location fields
-        if 'geoDataExif' in metadata and 'latitude' in metadata['geoDataExif'] and 'longitude' in metadata['geoDataExif']:
-            latitude = float(metadata['geoDataExif']['latitude'])
-            longitude = float(metadata['geoDataExif']['longitude'])
+            latitude = float(geo['latitude'])
+            longitude = float(geo['longitude'])
             
             # Ignore coordinates of 0,0 as they are likely invalid
             if latitude == 0 and longitude == 0:
                 return None
             
             # Validate coordinates (basic check)
-            if abs(latitude) <= 90 and abs(longitude) <= 180:
+            if -90 <= latitude <= 90 and -180 <= longitude <= 180:
                 return (latitude, longitude)
         
         return None
@@ -246,68 +425,310 @@ def get_gps_from_json(json_path: str) -> Optional[Tuple[float, float]]:
         return None
 
 
-def update_image_gps(image_path: str, gps_coords: Tuple[float, float]) -> bool:
+class ExifToolDaemon:
     """
-    Update the GPS coordinates in an image file.
-    This is a placeholder function as directly writing EXIF data is complex.
-    In a real implementation, you would use a library like piexif or exiftool.
-    
-    Returns True if successful, False otherwise.
+    A single exiftool process kept running with -stay_open, so each metadata write is
+    one request over a pipe instead of starting exiftool (and Perl) for every image.
     """
-    if not HAS_PIL:
-        return False
     
-    # This is a simplified implementation that would need to be replaced
-    # with a proper EXIF writing solution in a production environment.
-    # For now, we'll just return True to simulate success.
-    
-    # In a real implementation, you would:
-    # 1. Extract existing EXIF data
-    # 2. Update the GPS tags
-    # 3. Write the updated EXIF data back to the file
+    def __init__(self, executable: str):
+        self.process = subprocess.Popen(
+            [executable, '-stay_open', 'True', '-@', '-'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            encoding='utf-8'
+        )
+        atexit.register(self.close)
+    
+    def execute(self, *args: str) -> str:
+        """
+        Run one exiftool command and return its output.
+        Only the thread that borrowed the process from the pool may call this.
+        Raises OSError if exiftool exits before finishing the command.
+        """
+        # One argument per line, the command ends at -execute
+        self.process.stdin.write('\n'.join(args) + '\n-execute\n')
+        self.process.stdin.flush()
+        
+        # exiftool prints {ready} once the command has finished
+        output = []
+        for line in self.process.stdout:
+            if line.startswith('{ready'):
+                return ''.join(output)
+            output.append(line)
+        # End of output without {ready}: exiftool is gone and can't take more commands
+        raise OSError(f'exiftool exited: {"".join(output).strip()}')
+    
+    def close(self) -> None:
+        """Ask exiftool to exit and wait for it."""
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.write('-stay_open\nFalse\n')
+                self.process.stdin.flush()
+                self.process.wait(timeout=10)
+            except (OSError, ValueError, subprocess.TimeoutExpired):
+                self.process.kill()
+
+
+# Idle exiftool processes. Worker threads each borrow one for a write, and more are
+# started on demand up to one per CPU core, so EXIF writes don't queue behind a single
+# process while workers are waiting on the disk
+EXIFTOOL_MAX_PROCESSES = os.cpu_count() or 1
+_exiftool_idle = queue.Queue()
+_exiftool_started = 0
+_exiftool_lock = threading.Lock()
+
+
+def acquire_exiftool() -> Optional[ExifToolDaemon]:
+    """Borrow an exiftool process, starting one if all are busy, or None if exiftool is not installed."""
+    global _exiftool_started
+    if not EXIFTOOL_PATH:
+        return None
+    while True:
+        try:
+            exiftool = _exiftool_idle.get_nowait()
+        except queue.Empty:
+            with _exiftool_lock:
+                if _exiftool_started < EXIFTOOL_MAX_PROCESSES:
+                    _exiftool_started += 1
+                    try:
+                        return ExifToolDaemon(EXIFTOOL_PATH)
+                    except OSError:
+                        _exiftool_started -= 1
+                        # Pass the free slot on to any thread waiting below
+                        _exiftool_idle.put(None)
+                        raise
+            # Every process is busy, wait for one to be handed back
+            exiftool = _exiftool_idle.get()
+        
+        # None marks the slot of a discarded process, start a fresh one in its place
+        if exiftool is None:
+            continue
+        # A process that exited while idle can't take commands any more
+        if exiftool.process.poll() is not None:
+            discard_exiftool(exiftool)
+            continue
+        return exiftool
+
+
+def release_exiftool(exiftool: ExifToolDaemon) -> None:
+    """Hand a borrowed exiftool process back for the next write."""
+    _exiftool_idle.put(exiftool)
+
+
+def discard_exiftool(exiftool: ExifToolDaemon) -> None:
+    """Stop a borrowed exiftool process that failed, so a fresh one is started in its place."""
+    global _exiftool_started
+    exiftool.close()
+    with _exiftool_lock:
+        _exiftool_started -= 1
+    # Wake a thread waiting for a process, it starts the replacement
+    _exiftool_idle.put(None)
+
+
+def write_exif_tags(image_path: str, tags: List[str]) -> Optional[bool]:
+    """
+    Write tag assignments (like '-GPSLatitude=1.5') to an image with exiftool.
+    Returns whether the file was updated, or None if exiftool is not installed or
+    can't be started, so the caller can fall back to another writer.
+    """
+    # A process that dies mid-command is discarded, and the write is tried once more
+    # on a fresh one
+    for _ in range(2):
+        try:
+            exiftool = acquire_exiftool()
+        except OSError:
+            return None
+        if exiftool is None:
+            return None
+        
+        try:
+            # -P keeps the file modification date that was already fixed from the JSON,
+            # -charset makes exiftool read the UTF-8 file names written to its pipe
+            output = exiftool.execute('-overwrite_original', '-P', '-charset', 'filename=utf8', *tags, image_path)
+        except (OSError, ValueError):
+            discard_exiftool(exiftool)
+            continue
+        release_exiftool(exiftool)
+        return '1 image files updated' in output
+    return False
+
+
+def to_exif_rational(degrees: float) -> Tuple[Tuple[int, int], Tuple[int, int], Tuple[int, int]]:
+    """Convert decimal degrees to EXIF degrees/minutes/seconds rationals (seconds in 1/100)."""
+    hundredths = int(round(abs(degrees) * 360000))
+    d, remainder = divmod(hundredths, 360000)
+    m, s = divmod(remainder, 6000)
+    return ((d, 1), (m, 1), (s, 100))
+
+
+def set_exif_fields(exif_dict: Dict[str, Any], gps_coords: Optional[Tuple[float, float]] = None, description: Optional[str] = None) -> None:
+    """Set GPS and/or description tags in a piexif EXIF dict."""
+    if gps_coords:
+        latitude, longitude = gps_coords
+        gps_ifd = exif_dict.setdefault('GPS', {})
+        gps_ifd[piexif.GPSIFD.GPSLatitudeRef] = b'S' if latitude < 0 else b'N'
+        gps_ifd[piexif.GPSIFD.GPSLatitude] = to_exif_rational(latitude)
+        gps_ifd[piexif.GPSIFD.GPSLongitudeRef] = b'W' if longitude < 0 else b'E'
+        gps_ifd[piexif.GPSIFD.GPSLongitude] = to_exif_rational(longitude)
+    
+    if description:
+        exif_dict.setdefault('0th', {})[piexif.ImageIFD.ImageDescription] = description.encode('utf-8')
+        exif_dict.setdefault('Exif', {})[piexif.ExifIFD.UserComment] = piexif.helper.UserComment.dump(description, encoding='unicode')
+
+
+def dump_exif(exif_dict: Dict[str, Any], image_path: str) -> bytes:
+    """
+    Encode a piexif EXIF dict for a JPEG's APP1 segment, keeping the embedded thumbnail.
+    Only when the segment would be too large is it encoded again without the thumbnail.
+    """
+    try:
+        exif_bytes = piexif.dump(exif_dict)
+    except ValueError as e:
+        # piexif refuses thumbnails over 64kB
+        if 'thumbnail' not in str(e):
+            raise
+        exif_bytes = None
+    if exif_bytes is not None and len(exif_bytes) <= MAX_EXIF_SEGMENT_SIZE:
+        return exif_bytes
+    if not exif_dict.get('thumbnail'):
+        raise ValueError('EXIF data is too large for a JPEG APP1 segment')
+    
+    print(f"{Colors.YELLOW}EXIF data too large for {os.path.basename(image_path)}, dropping its embedded thumbnail{Colors.ENDC}")
+    exif_dict = dict(exif_dict)
+    exif_dict.pop('1st', None)
+    exif_dict.pop('thumbnail', None)
+    return piexif.dump(exif_dict)
+
+
+def replace_exif_segment(data: bytes, exif_bytes: bytes) -> bytes:
+    """
+    Return a JPEG's bytes with its Exif APP1 segment replaced by exif_bytes (as made by
+    piexif.dump). Every other segment, like the JFIF APP0 header and XMP, is kept as-is.
+    Without an Exif segment, the new one goes after the APP0 segments at the start.
+    Raises ValueError if the data is not a well-formed JPEG.
+    """
+    if data[:2] != b'\xff\xd8':
+        raise ValueError('Not a JPEG file')
+    
+    parts = [data[:2]]
+    exif_index = None
+    # Index in parts just past the APP0 segments that directly follow the SOI marker
+    after_app0 = 1
+    pos = 2
+    while True:
+        if pos + 4 > len(data) or data[pos] != 0xFF:
+            raise ValueError('Malformed JPEG segment')
+        marker = data[pos + 1]
+        # Start of scan: the image data follows and is copied untouched
+        if marker == 0xDA:
+            break
+        end = pos + 2 + struct.unpack('>H', data[pos + 2:pos + 4])[0]
+        if end <= pos + 2 or end > len(data):
+            raise ValueError('Malformed JPEG segment')
+        
+        if marker == 0xE1 and data[pos + 4:pos + 10] == b'Exif\x00\x00':
+            # The first Exif segment is replaced and any duplicates are dropped
+            if exif_index is None:
+                exif_index = len(parts)
+        else:
+            parts.append(data[pos:end])
+            if marker == 0xE0 and after_app0 == len(parts) - 1:
+                after_app0 = len(parts)
+        pos = end
+    
+    segment = b'\xff\xe1' + struct.pack('>H', len(exif_bytes) + 2) + exif_bytes
+    parts.insert(after_app0 if exif_index is None else exif_index, segment)
+    parts.append(data[pos:])
+    return b''.join(parts)
+
+
+def patch_jpeg_exif(image_path: str, gps_coords: Optional[Tuple[float, float]] = None, description: Optional[str] = None) -> Optional[bool]:
+    """
+    Patch GPS and/or description tags into a JPEG's EXIF segment with piexif.
+    Only the Exif APP1 segment is rewritten, the other segments and the pixel
+    data are kept byte for byte.
+    Returns whether the file was updated, or None if piexif can't handle the file.
+    """
+    if not HAS_PIEXIF or os.path.splitext(image_path)[1].lower() not in ('.jpg', '.jpeg'):
+        return None
     
-    # For a proper implementation, consider using exiftool:
-    # subprocess.run(['exiftool', 
-    #                '-GPSLatitude=' + str(gps_coords[0]), 
-    #                '-GPSLongitude=' + str(gps_coords[1]),
-    #                '-GPSLatitudeRef=' + ('S' if gps_coords[0] < 0 else 'N'),
-    #                '-GPSLongitudeRef=' + ('W' if gps_coords[1] < 0 else 'E'),
-    #                image_path])
+    try:
+        # Rewriting the file changes its dates, keep the ones already fixed from the JSON
+        file_stat = os.stat(image_path)
+        with open(image_path, 'rb') as f:
+            data = f.read()
+        exif_dict = piexif.load(data)
+        set_exif_fields(exif_dict, gps_coords, description)
+        data = replace_exif_segment(data, dump_exif(exif_dict, image_path))
+        with open(image_path, 'wb') as f:
+            f.write(data)
+        os.utime(image_path, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+        return True
+    except Exception:
+        return False
+
+
+def copy_and_patch_jpeg(src: str, dst: str, gps_coords: Optional[Tuple[float, float]] = None, description: Optional[str] = None) -> Optional[bool]:
+    """
+    Copy a JPEG with GPS and/or description tags patched into its EXIF segment.
+    The image is read once and written once, instead of copied and then rewritten.
+    Returns True once the copy is written, or None if piexif can't handle the file.
+    """
+    if not HAS_PIEXIF or os.path.splitext(src)[1].lower() not in ('.jpg', '.jpeg'):
+        return None
     
-    # Return True to simulate success
-    return True
+    try:
+        with open(src, 'rb') as f:
+            data = f.read()
+        exif_dict = piexif.load(data)
+        set_exif_fields(exif_dict, gps_coords, description)
+        data = replace_exif_segment(data, dump_exif(exif_dict, src))
+        with open(dst, 'wb') as f:
+            f.write(data)
+        return True
+    except Exception:
+        # The caller copies the file normally, overwriting anything written here
+        return None
 
 
-def update_image_description(image_path: str, description: str) -> bool:
+def update_image_metadata(image_path: str, gps_coords: Optional[Tuple[float, float]] = None, description: Optional[str] = None) -> bool:
     """
-    Update the description in an image file's EXIF data.
-    This is a placeholder function as directly writing EXIF data is complex.
-    In a real implementation, you would use a library like piexif or exiftool.
+    Update the GPS coordinates and/or the description in an image file's EXIF data.
+    Both are written in one exiftool request (or one piexif patch for JPEGs), so the
+    image is only rewritten once when both change.
     
-    Returns True if successful, False otherwise.
+    Returns True if the image was written, False if the write failed or there is no
+    EXIF writer for this file (no exiftool, and not a JPEG piexif can patch).
     """
-    if not HAS_PIL or not description:
+    if not HAS_PIL or not (gps_coords or description):
         return False
     
-    # This is a simplified implementation that would need to be replaced
-    # with a proper EXIF writing solution in a production environment.
-    # For now, we'll just return True to simulate success.
-    
-    # In a real implementation, you would:
-    # 1. Extract existing EXIF data
-    # 2. Update the Description tag
-    # 3. Write the updated EXIF data back to the file
-    
-    # For a proper implementation, consider using exiftool:
-    # subprocess.run(['exiftool', 
-    #                '-Description=' + description,
-    #                '-ImageDescription=' + description,
-    #                '-XPComment=' + description,
-    #                '-UserComment=' + description,
-    #                image_path])
-    
-    # Return True to simulate success
-    return True
+    tags = []
+    if gps_coords:
+        latitude, longitude = gps_coords
+        tags += [
+            f'-GPSLatitude={abs(latitude)}',
+            f'-GPSLatitudeRef={"S" if latitude < 0 else "N"}',
+            f'-GPSLongitude={abs(longitude)}',
+            f'-GPSLongitudeRef={"W" if longitude < 0 else "E"}'
+        ]
+    if description:
+        # exiftool reads one argument per line, so line breaks become spaces
+        description = ' '.join(description.splitlines())
+        tags += [
+            '-Description=' + description,
+            '-ImageDescription=' + description,
+            '-XPComment=' + description,
+            '-UserComment=' + description
+        ]
+    
+    written = write_exif_tags(image_path, tags)
+    if written is None:
+        written = patch_jpeg_exif(image_path, gps_coords=gps_coords, description=description)
+    # None means nothing could write this file, so it is not counted as updated
+    return bool(written)
 
 
 def fix_powershell_args(debug_mode=False):
@@ -361,16 +782,22 @@ def parse_arguments():
                         help='Directory into which the processed output will be written')
     parser.add_argument('-e', '--error-dir', required=True,
                         help='Directory for any files that have errors during processing')
-    parser.add_argument('-p', '--parallel', type=int, default=1,
-                        help='Number of parallel processes to use (default: 1, increase for faster processing on SSD/NVMe drives)')
+    parser.add_argument('-p', '--parallel', type=int, default=0,
+                        help=f'Number of parallel worker threads to use (default: 0 = auto, {DEFAULT_WORKERS} on SSDs '
+                             f'and {HDD_WORKERS} when the input is on a spinning HDD)')
     parser.add_argument('-d', '--debug', action='store_true',
                         help='Copy files without date updates to error directory for inspection')
     parser.add_argument('-q', '--quiet', action='store_true',
                         help='Reduce verbosity of output messages (only show critical errors and summary)')
     parser.add_argument('-u', '--force-utc', action='store_true',
-                        help='Force UTC timezone for all timestamps (useful if timestamps are in UTC but not marked as such)')
+                        help='Show the sample dates printed in the summary in UTC instead of local time '
+                             '(display only, the file dates are set from the Unix timestamps either way)')
     parser.add_argument('-s', '--single-file', 
                         help='Process only a single file (for debugging purposes)')
+    parser.add_argument('--link', action='store_true',
+                        help='Hardlink files into the output directory when on the same drive instead of copying '
+                             '(WARNING: date updates will also change the original files, and GPS and '
+                             'descriptions are not written to linked files so the originals are not modified)')
     
     # Print the arguments for debugging only if debug mode is enabled
     if debug_mode:
@@ -380,9 +807,9 @@ def parse_arguments():
         args = parser.parse_args()
         
         # Strip any extra quotes that might be present in Windows paths
-        input_dir = args.input_dir.strip("'\"")
-        output_dir = args.output_dir.strip("'\"")
-        error_dir = args.error_dir.strip("'\"")
+        args.input_dir = input_dir = args.input_dir.strip("'\"")
+        args.output_dir = output_dir = args.output_dir.strip("'\"")
+        args.error_dir = error_dir = args.error_dir.strip("'\"")
         debug_mode = args.debug
         
         # Print parsed arguments only if debug mode is enabled
@@ -405,7 +832,41 @@ def parse_arguments():
         print(f"{Colors.YELLOW}Note: If your path contains spaces, in PowerShell use: -i=\"Your Path\"{Colors.ENDC}")
         sys.exit(1)
     
-    return input_dir, output_dir, error_dir, debug_mode
+    return args
+
+
+def is_rotational_drive(path: str) -> Optional[bool]:
+    """
+    Return whether path is on a spinning disk, or None if that can't be told.
+    Only Linux reports it (through /sys/dev/block), other platforms return None.
+    """
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        dev = os.stat(path).st_dev
+        block_dir = os.path.realpath(f'/sys/dev/block/{os.major(dev)}:{os.minor(dev)}')
+        # Virtual disks (virtio, device-mapper, loop, ...) report rotational=1 whatever
+        # they are backed by, so their flag says nothing about the real drive
+        if '/devices/virtual/' in block_dir or '/virtio' in block_dir:
+            return None
+        # A partition has no queue of its own, the disk it belongs to is its parent
+        for device_dir in (block_dir, os.path.dirname(block_dir)):
+            rotational_path = os.path.join(device_dir, 'queue', 'rotational')
+            if os.path.exists(rotational_path):
+                with open(rotational_path) as f:
+                    return f.read().strip() == '1'
+    except (OSError, ValueError):
+        pass
+    # Network shares and virtual filesystems have no block device to ask
+    return None
+
+
+def choose_workers(input_dir: str) -> int:
+    """Pick the number of worker threads for the drive the input directory is on."""
+    if is_rotational_drive(input_dir):
+        print(f"{Colors.YELLOW}Input directory is on a spinning HDD, using {HDD_WORKERS} worker thread(s) (use -p to override){Colors.ENDC}")
+        return HDD_WORKERS
+    return DEFAULT_WORKERS
 
 
 def validate_directories(input_dir: str, output_dir: str, error_dir: str, debug_mode: bool = False) -> None:
@@ -444,190 +905,304 @@ def validate_directories(input_dir: str, output_dir: str, error_dir: str, debug_
             sys.exit(1)
 
 
-def find_media_files(input_dir: str, debug_mode: bool = False) -> List[Dict[str, Any]]:
-    """Find all media files and their associated JSON metadata files."""
+def list_dir(dir_path: str) -> Tuple[List[os.DirEntry], List[str]]:
+    """
+    List one directory, returning its file entries and subdirectory paths.
+    Uses os.scandir directly so the file/directory checks reuse the type
+    information from the directory listing instead of issuing extra stat calls.
+    """
+    files = []
+    subdirs = []
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # Like os.walk, don't follow symlinked directories
+                    if not entry.is_symlink():
+                        subdirs.append(entry.path)
+                else:
+                    files.append(entry)
+    except OSError:
+        # Skip unreadable directories, as os.walk does
+        pass
+    return files, subdirs
+
+
+def iter_files(root: str):
+    """Yield an os.DirEntry for every file below root, one directory at a time."""
+    stack = [root]
+    while stack:
+        files, subdirs = list_dir(stack.pop())
+        stack.extend(subdirs)
+        yield from files
+
+
+def scan_directories(root: str, workers: int = DEFAULT_WORKERS) -> List[Tuple[str, List[os.DirEntry]]]:
+    """
+    List every directory below root in parallel, returning (directory, file entries) pairs.
+    Albums are independent directories, so keeping several listings in flight hides
+    the per-directory latency of HDDs and network drives.
+    """
+    files_by_dir = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(list_dir, root): root}
+        while futures:
+            done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                dir_path = futures.pop(future)
+                files, subdirs = future.result()
+                files_by_dir[dir_path] = files
+                for subdir in subdirs:
+                    futures[executor.submit(list_dir, subdir)] = subdir
+    
+    # Return the directories in a stable order, whichever listing finished first
+    return sorted(files_by_dir.items(), key=operator.itemgetter(0))
+
+
+def media_extension(filename: str) -> str:
+    """Return the lowercased extension of a supported media file, or '' for anything else."""
+    # Single C-level scan for the extension, lowercased for case-insensitive comparison
+    head, _, tail = filename.rpartition('.')
+    if not head:
+        return ''
+    file_ext = '.' + tail.lower()
+    return file_ext if file_ext in MEDIA_EXTENSIONS else ''
+
+
+def find_json_sidecar(media_path: str, base_path: Optional[str] = None, exists=os.path.exists) -> Optional[str]:
+    """
+    Return the first JSON sidecar found for a media file, or None.
+    Tries the names Takeout uses in order: file.jpg.json, file.jpg.suppl.json,
+    file.jpg.supplemental-metadata.json and file.json. base_path is the media path
+    without its extension, and exists is the check used for each candidate.
+    """
+    for suffix in JSON_SIDECAR_SUFFIXES:
+        json_path = media_path + suffix
+        if exists(json_path):
+            return json_path
+    if base_path is None:
+        base_path = os.path.splitext(media_path)[0]
+    json_path = base_path + '.json'
+    return json_path if exists(json_path) else None
+
+
+@functools.lru_cache(maxsize=DIR_INDEX_CACHE_SIZE)
+def dir_index(dir_path: str) -> frozenset:
+    """Return the lowercased names in a directory, listed once and shared by every lookup in it."""
+    try:
+        return frozenset(name.lower() for name in os.listdir(dir_path))
+    except OSError:
+        return frozenset()
+
+
+def listed_path_exists(path: str) -> bool:
+    """
+    Check whether a file exists, answering misses from the cached directory listing.
+    Names that match case-insensitively are confirmed with a real check, so the result
+    still follows the file system's own case rules.
+    """
+    dir_path, name = os.path.split(path)
+    if name.lower() not in dir_index(dir_path):
+        return False
+    return os.path.exists(path)
+
+
+def find_media_files(input_dir: str, workers: int = DEFAULT_WORKERS) -> Tuple[List[Tuple[str, List[os.DirEntry]]], int]:
+    """
+    Scan the input directory and print a summary of the media files found.
+    Returns the listed directories and the number of media files; JSON metadata and
+    companion files are matched per directory by iter_media_files while the files
+    are being processed.
+    """
     print(f"{Colors.HEADER}Scanning for media files...{Colors.ENDC}")
     
-    # Supported media file extensions (all lowercase for case-insensitive comparison)
-    media_extensions = {
-        '.jpg', '.jpeg', '.png', '.gif', '.heic', '.mp4', '.mov', 
-        '.avi', '.mkv', '.nef', '.dng', '.raw', '.cr2', '.cr3', 
-        '.arw', '.orf', '.rw2', '.pef', '.raf'
-    }
+    directories = scan_directories(input_dir, workers)
     
+    # Count file formats in one C-level pass over the listed names
+    format_counter = Counter(
+        file_ext
+        for _, entries in directories
+        for file_ext in map(media_extension, map(operator.attrgetter('name'), entries))
+        if file_ext
+    )
+    
+    total_files = sum(format_counter.values())
+    
+    # Print summary of file formats
+    print(f"{Colors.BOLD}Found {total_files} media files.{Colors.ENDC}")
+    print(f"\n{Colors.CYAN}=== File Format Summary ==={Colors.ENDC}")
+    for ext, count in format_counter.most_common():
+        print(f"{Colors.BLUE}{ext:<6}{Colors.ENDC}: {Colors.GREEN}{count}{Colors.ENDC}")
+    print(f"{Colors.CYAN}========================={Colors.ENDC}\n")
+    
+    return directories, total_files
+
+
+def iter_media_files(directories: List[Tuple[str, List[os.DirEntry]]], debug_mode: bool = False):
+    """
+    Yield the media file records directory by directory, in filename order.
+    Takeout keeps JSON sidecars and both halves of a Live Photo in the same folder as
+    the media file, so each directory is matched on its own, just before its files
+    are processed, instead of matching the whole Takeout up front.
+    """
+    for dir_path, entries in directories:
+        media_files = match_media_files(dir_path, entries, debug_mode)
+        media_files.sort(key=operator.itemgetter('filename'))
+        yield from media_files
+
+
+def match_media_files(dir_path: str, entries: List[os.DirEntry], debug_mode: bool = False) -> List[Dict[str, Any]]:
+    """Build the media file records for one directory and find their JSON metadata and companion files."""
     # Apple Live Photo companion extensions (photo + video pairs)
     # Common pairs: HEIC+MP4, JPG+MOV, JPG+MP4, etc.
-    photo_extensions = {'.heic', '.jpg', '.jpeg'}
-    video_extensions = {'.mp4', '.mov'}
+    photo_extensions = frozenset({'.heic', '.jpg', '.jpeg'})
+    video_extensions = frozenset({'.mp4', '.mov'})
     
     # Dictionary to store all media files by their path
     all_files_dict = {}
     # Dictionary to map base names to their files (for finding companions)
     base_name_map = {}
-    format_counter = Counter()
-    
-    # First pass: collect all media files and build the base name map
-    for root, _, files in os.walk(input_dir):
-        for file in files:
-            file_path = os.path.join(root, file)
-            file_ext = os.path.splitext(file)[1].lower()  # Convert to lowercase for case-insensitive comparison
+    # Every file path and lowercased name in the directory, so probing for JSON
+    # sidecars is a set lookup instead of a stat call per candidate name. The listing
+    # is complete up front, so sidecars are found in the same pass as the media files
+    # instead of a second loop over the records
+    known_paths = {entry.path for entry in entries}
+    known_names = {entry.name.lower() for entry in entries}
+    # Names of the photos in the directory, shared by every record so videos without
+    # metadata can look for similar-named photos without listing the directory again
+    image_names = []
+    
+    def is_listed(path):
+        # Names that only match case-insensitively are confirmed with a real check, like
+        # listed_path_exists, so case-insensitive file systems (macOS, Windows) still
+        # find a sidecar whose case differs from the media file's
+        if path in known_paths:
+            return True
+        return os.path.basename(path).lower() in known_names and os.path.exists(path)
+    
+    # First pass: collect all media files with their JSON metadata, and build the base name map
+    for entry in entries:
+        file_path = entry.path
+        file = entry.name
+        
+        # Skip JSON files
+        if file.endswith('.json'):
+            continue
+        
+        # Check if this is a supported media file
+        file_ext = media_extension(file)
+        if file_ext:
+            # Store the file info; the extension is interned since there are only a
+            # handful of distinct values shared by every record
+            file_info = {
+                'media_path': file_path,
+                'json_path': None,
+                'filename': file,
+                'extension': sys.intern(file_ext),
+                'dir_path': dir_path,
+                'is_companion': False,
+                'companion_path': None,
+                'companion_json_path': None,
+                'dir_image_names': image_names
+            }
             
-            # Skip JSON files
-            if file_ext == '.json':
-                continue
+            all_files_dict[file_path] = file_info
+            if file_ext in photo_extensions:
+                image_names.append(file)
             
-            # Check if this is a supported media file
-            if file_ext in media_extensions:
-                # Count file formats
-                format_counter[file_ext] += 1
-                
-                # Store the file info
-                file_info = {
-                    'media_path': file_path,
-                    'json_path': None,
-                    'filename': file,
-                    'extension': file_ext,
-                    'is_companion': False,
-                    'companion_path': None
-                }
-                
-                all_files_dict[file_path] = file_info
-                
-                # Add to base name map for companion detection
-                base_name = os.path.splitext(file_path)[0]
-                if base_name not in base_name_map:
-                    base_name_map[base_name] = []
-                base_name_map[base_name].append(file_path)
-    
-    # Second pass: find JSON metadata and identify companion files
-    for file_path, file_info in all_files_dict.items():
-        # Look for corresponding JSON files with different naming patterns
-        # Pattern 1: file.jpg.json
-        json_path1 = file_path + '.json'
-        # Pattern 2: file.jpg.suppl.json
-        json_path2 = file_path + '.suppl.json'
-        # Pattern 3: file.mp4.supplemental-metadata.json
-        json_path3 = file_path + '.supplemental-metadata.json'
-        # Pattern 4: file.json (where file is without extension)
-        base_name = os.path.splitext(file_path)[0]
-        json_path4 = base_name + '.json'
-        
-        # Special handling for files with parentheses
-        # For files like IMG_0624(1).MOV, also check for IMG_0624.MOV.json
-        original_name = None
-        if '(' in file_info['filename']:
-            # Extract the original filename without the (n) part
-            filename = file_info['filename']
-            ext = os.path.splitext(filename)[1]
-            name_part = os.path.splitext(filename)[0]
+            # Add to base name map for companion detection (the path minus the
+            # extension found above, without a second splitext)
+            # Paths are kept in tuples: nearly every base name has a single file, and a
+            # 1-tuple is smaller than a list with its spare growth capacity
+            base_name = file_path[:-len(file_ext)]
+            base_name_map[base_name] = base_name_map.get(base_name, ()) + (file_path,)
+            
+            # Look for the JSON sidecar under each of Takeout's naming patterns
+            json_path = find_json_sidecar(file_path, base_name, is_listed)
             
-            # Find the position of the opening parenthesis
-            paren_pos = name_part.find('(')
-            if paren_pos > 0:
-                original_name = name_part[:paren_pos] + ext
-                dir_path = os.path.dirname(file_path)
-                original_path = os.path.join(dir_path, original_name)
+            # Special handling for files with parentheses
+            # For files like IMG_0624(1).MOV, also check for IMG_0624.MOV.json
+            if not json_path and '(' in file:
+                # Extract the original filename without the (n) part
+                name_part, ext = os.path.splitext(file)
                 
-                # Check for JSON files with the original name
-                json_path5 = original_path + '.json'
-                json_path6 = original_path + '.suppl.json'
-                json_path7 = original_path + '.supplemental-metadata.json'
-                json_path8 = os.path.splitext(original_path)[0] + '.json'
-        
-        # Check each pattern
-        if os.path.exists(json_path1):
-            file_info['json_path'] = json_path1
-        elif os.path.exists(json_path2):
-            file_info['json_path'] = json_path2
-        elif os.path.exists(json_path3):
-            file_info['json_path'] = json_path3
-        elif os.path.exists(json_path4):
-            file_info['json_path'] = json_path4
-        # Check patterns for original name (without parentheses)
-        elif original_name and os.path.exists(json_path5):
-            file_info['json_path'] = json_path5
-            if debug_mode:
-                print(f"{Colors.YELLOW}Found JSON for {file_info['filename']} using original name {original_name}{Colors.ENDC}")
-        elif original_name and os.path.exists(json_path6):
-            file_info['json_path'] = json_path6
-            if debug_mode:
-                print(f"{Colors.YELLOW}Found JSON for {file_info['filename']} using original name {original_name}{Colors.ENDC}")
-        elif original_name and os.path.exists(json_path7):
-            file_info['json_path'] = json_path7
-            if debug_mode:
-                print(f"{Colors.YELLOW}Found JSON for {file_info['filename']} using original name {original_name}{Colors.ENDC}")
-        elif original_name and os.path.exists(json_path8):
-            file_info['json_path'] = json_path8
-            if debug_mode:
-                print(f"{Colors.YELLOW}Found JSON for {file_info['filename']} using original name {original_name}{Colors.ENDC}")
-    
-    # Third pass: identify companion files (Apple Live Photos)
-    companion_count = 0
+                # Find the position of the opening parenthesis
+                paren_pos = name_part.find('(')
+                if paren_pos > 0:
+                    original_name = name_part[:paren_pos] + ext
+                    original_path = os.path.join(dir_path, original_name)
+                    
+                    # Check for JSON files with the original name
+                    json_path = find_json_sidecar(original_path, exists=is_listed)
+                    if json_path and debug_mode:
+                        print(f"{Colors.YELLOW}Found JSON for {file} using original name {original_name}{Colors.ENDC}")
+            
+            file_info['json_path'] = json_path
     
+    # Second pass: identify companion files (Apple Live Photos)
     # First, identify companions with exact base name matches
     for base_name, file_paths in base_name_map.items():
-        if len(file_paths) > 1:  # Potential companion files found
-            # Group by extension type
-            photos = []
-            videos = []
+        # Only groups with more than one file can hold companions
+        if len(file_paths) < 2:
+            continue
+        
+        # Group by extension type
+        photos = [path for path in file_paths if all_files_dict[path]['extension'] in photo_extensions]
+        videos = [path for path in file_paths if all_files_dict[path]['extension'] in video_extensions]
+        
+        # If we have both photo and video with the same base name, they're companions
+        if photos and videos:
+            pair_paths = photos + videos
             
-            for path in file_paths:
-                ext = os.path.splitext(path)[1].lower()
-                if ext in photo_extensions:
-                    photos.append(path)
-                elif ext in video_extensions:
-                    videos.append(path)
+            # Find the file with metadata to be the primary
+            primary_path = None
+            for path in pair_paths:
+                if all_files_dict[path]['json_path'] is not None:
+                    primary_path = path
+                    break
             
-            # If we have both photo and video with the same base name, they're companions
-            if photos and videos:
-                # Find the file with metadata to be the primary
-                primary_path = None
-                for path in photos + videos:
-                    if all_files_dict[path]['json_path'] is not None:
-                        primary_path = path
-                        break
-                
-                # If we found a primary file with metadata
-                if primary_path:
-                    for path in photos + videos:
-                        if path != primary_path and all_files_dict[path]['json_path'] is None:
-                            # Mark as companion and link to primary
-                            all_files_dict[path]['is_companion'] = True
-                            all_files_dict[path]['companion_path'] = primary_path
-                            companion_count += 1
+            # If we found a primary file with metadata
+            if primary_path:
+                for path in pair_paths:
+                    if path != primary_path and all_files_dict[path]['json_path'] is None:
+                        # Mark as companion and link to primary
+                        all_files_dict[path]['is_companion'] = True
+                        all_files_dict[path]['companion_path'] = primary_path
     
     # Second, look for companions with similar base names and close timestamps
     # This handles cases where the naming convention might be slightly different
     # or timestamps in filenames are slightly off
     
-    # Group files by their directory
-    files_by_dir = {}
-    for file_path, file_info in all_files_dict.items():
-        # Skip files that are already identified as companions
-        if file_info['is_companion']:
+    # Group the files that are not companions yet by extension type. Matching compares
+    # the photo taken times from both sidecars, so files without JSON metadata can never
+    # pair up here and are left out before any index is built
+    photos = []
+    videos = []
+    
+    for path, file_info in all_files_dict.items():
+        # Skip files that are already identified as companions, or have no metadata
+        if file_info['is_companion'] or not file_info['json_path']:
             continue
         
-        dir_path = os.path.dirname(file_path)
-        if dir_path not in files_by_dir:
-            files_by_dir[dir_path] = []
-        files_by_dir[dir_path].append(file_path)
-    
-    # For each directory, look for potential companions
-    for dir_path, file_paths in files_by_dir.items():
-        # Group files by extension type
-        photos = []
-        videos = []
-        
-        for path in file_paths:
-            ext = os.path.splitext(path)[1].lower()
-            if ext in photo_extensions:
-                photos.append(path)
-            elif ext in video_extensions:
-                videos.append(path)
-        
-        # Skip if we don't have both photos and videos in this directory
-        if not photos or not videos:
-            continue
+        if file_info['extension'] in photo_extensions:
+            photos.append(path)
+        elif file_info['extension'] in video_extensions:
+            videos.append(path)
+    
+    # Only look further if we have both photos and videos with metadata in this directory
+    if photos and videos:
+        # Index the videos by base name. Names starting with a given prefix sit next to
+        # each other once sorted, so each photo finds its candidate videos with a binary
+        # search instead of comparing against every video in the directory
+        def base_of(path):
+            file_info = all_files_dict[path]
+            return file_info['filename'][:-len(file_info['extension'])]
+        
+        video_bases = sorted((base_of(video_path), index) for index, video_path in enumerate(videos))
+        sorted_bases = [base for base, _ in video_bases]
+        videos_by_base = {}
+        for base, index in video_bases:
+            videos_by_base.setdefault(base, []).append(index)
         
         # For each photo, look for a potential video companion
         for photo_path in photos:
@@ -635,256 +1210,140 @@ def find_media_files(input_dir: str, debug_mode: bool = False) -> List[Dict[str,
             if all_files_dict[photo_path]['is_companion']:
                 continue
             
-            photo_base = os.path.basename(photo_path)
-            photo_base_no_ext = os.path.splitext(photo_base)[0]
+            photo_base_no_ext = base_of(photo_path)
             
-            # Get photo timestamp from JSON if available
-            photo_time = None
-            if all_files_dict[photo_path]['json_path']:
-                photo_time = read_photo_taken_time(all_files_dict[photo_path]['json_path'])
+            # Get photo timestamp from its JSON
+            photo_ts = read_photo_taken_ts(all_files_dict[photo_path]['json_path'])
             
             # If we don't have a timestamp, skip this photo
-            if not photo_time:
+            if photo_ts is None:
                 continue
             
-            # Convert ISO format to datetime
-            photo_dt = datetime.fromisoformat(photo_time)
+            # Check if the base names are similar
+            # This handles cases like IMG_1234.jpg and IMG_1234_01.MP4
+            # or IMG_1234.jpg and IMG_1235.MP4
             
-            # For each video, check if it's a potential companion
-            for video_path in videos:
+            # Simple case: one is a prefix of the other. Videos whose name starts with
+            # the photo's name follow it in sorted order...
+            candidates = []
+            position = bisect.bisect_left(sorted_bases, photo_base_no_ext)
+            while position < len(video_bases) and sorted_bases[position].startswith(photo_base_no_ext):
+                candidates.append(video_bases[position][1])
+                position += 1
+            # ...and videos whose name the photo's name starts with are its prefixes
+            for length in range(1, len(photo_base_no_ext)):
+                candidates.extend(videos_by_base.get(photo_base_no_ext[:length], ()))
+            
+            # Check the candidates in directory order, like a scan over every video would
+            for index in sorted(candidates):
+                video_path = videos[index]
+                
                 # Skip if this video is already a companion
                 if all_files_dict[video_path]['is_companion']:
                     continue
                 
-                video_base = os.path.basename(video_path)
-                video_base_no_ext = os.path.splitext(video_base)[0]
+                # Get video timestamp from its JSON
+                video_ts = read_photo_taken_ts(all_files_dict[video_path]['json_path'])
                 
-                # Check if the base names are similar
-                # This handles cases like IMG_1234.jpg and IMG_1234_01.MP4
-                # or IMG_1234.jpg and IMG_1235.MP4
-                
-                # Simple case: one is a prefix of the other
-                if video_base_no_ext.startswith(photo_base_no_ext) or photo_base_no_ext.startswith(video_base_no_ext):
-                    # Get video timestamp from JSON if available
-                    video_time = None
-                    if all_files_dict[video_path]['json_path']:
-                        video_time = read_photo_taken_time(all_files_dict[video_path]['json_path'])
+                # If we have timestamps for both, check if they're close
+                if video_ts is not None:
+                    time_diff = abs(video_ts - photo_ts)
                     
-                    # If we have timestamps for both, check if they're close
-                    if video_time:
-                        video_dt = datetime.fromisoformat(video_time)
-                        time_diff = abs((video_dt - photo_dt).total_seconds())
-                        
-                        # If timestamps are within 5 seconds, consider them companions
-                        if time_diff <= 5:
-                            # Mark video as companion and link to photo
-                            all_files_dict[video_path]['is_companion'] = True
-                            all_files_dict[video_path]['companion_path'] = photo_path
-                            companion_count += 1
-                            break  # Found a companion for this photo, move to next
-    
-    # Convert dictionary to list for return
-    media_files = list(all_files_dict.values())
-    
-    # Print summary of file formats
-    print(f"{Colors.BOLD}Found {len(media_files)} media files.{Colors.ENDC}")
-    print(f"{Colors.BOLD}Identified {companion_count} companion files (Apple Live Photos).{Colors.ENDC}")
-    print(f"\n{Colors.CYAN}=== File Format Summary ==={Colors.ENDC}")
-    for ext, count in sorted(format_counter.items(), key=lambda x: x[1], reverse=True):
-        print(f"{Colors.BLUE}{ext:<6}{Colors.ENDC}: {Colors.GREEN}{count}{Colors.ENDC}")
-    print(f"{Colors.CYAN}========================={Colors.ENDC}\n")
+                    # If timestamps are within 5 seconds, consider them companions
+                    if time_diff <= 5:
+                        # Mark video as companion and link to photo
+                        all_files_dict[video_path]['is_companion'] = True
+                        all_files_dict[video_path]['companion_path'] = photo_path
+                        break  # Found a companion for this photo, move to next
+    
+    # Link each companion to its primary's metadata, so workers can resolve Live Photo
+    # pairs without searching the whole file list
+    for file_path, file_info in all_files_dict.items():
+        if file_info['is_companion'] and file_info['companion_path']:
+            primary_info = all_files_dict.get(file_info['companion_path'])
+            if primary_info:
+                file_info['companion_json_path'] = primary_info['json_path']
     
-    return media_files
+    return list(all_files_dict.values())
+
+
+def convert_timestamp(timestamp: Any, formatted_time: str, force_utc: bool = False) -> datetime:
+    """Convert a Google Takeout Unix timestamp to a datetime in UTC or local time."""
+    # Check if the formatted time contains timezone information or if force_utc is enabled
+    use_utc = force_utc or 'UTC' in formatted_time
+    
+    # Use UTC if the formatted time contains UTC or force_utc is enabled, otherwise use local timezone
+    if use_utc:
+        # timezone.utc works on every supported Python, no per-call import of datetime.UTC
+        return datetime.fromtimestamp(int(timestamp), timezone.utc)
+    return datetime.fromtimestamp(int(timestamp))
 
 
-def read_photo_taken_time(json_path: Optional[str], force_utc: bool = False) -> Optional[str]:
-    """Read the photo taken time from the Google JSON metadata file."""
+def read_photo_taken_ts(json_path: Optional[str], data: Optional[bytes] = None) -> Optional[int]:
+    """
+    Read the photo taken time from the Google JSON metadata file as a Unix timestamp.
+    Pass the file's bytes as data when the caller has already read them.
+    Results are cached by path, the sidecars don't change during a run.
+    """
     if not json_path:
         return None
     
     try:
-        with open(json_path, 'r', encoding='utf-8') as f:
-            metadata = json.load(f)
-        
-        # Debug output for specific problematic files
-        if "IMG_0538.JPG" in json_path or "IMG_0624(1).MOV" in json_path:
-            print(f"\n{Colors.YELLOW}DEBUG - Found problematic file: {json_path}{Colors.ENDC}")
-            print(f"{Colors.YELLOW}JSON metadata:{Colors.ENDC}")
-            if 'photoTakenTime' in metadata:
-                print(f"photoTakenTime: {metadata['photoTakenTime']}")
-            if 'creationTime' in metadata:
-                print(f"creationTime: {metadata['creationTime']}")
-            if 'modificationTime' in metadata:
-                print(f"modificationTime: {metadata['modificationTime']}")
-            print(f"{Colors.YELLOW}End of debug output{Colors.ENDC}\n")
+        return _photo_taken_cache[json_path]
+    except KeyError:
+        pass
+    
+    timestamp = load_photo_taken_ts(json_path, data)
+    if len(_photo_taken_cache) >= PHOTO_TAKEN_CACHE_SIZE:
+        _photo_taken_cache.clear()
+    _photo_taken_cache[json_path] = timestamp
+    return timestamp
+
+
+def load_photo_taken_ts(json_path: str, data: Optional[bytes] = None) -> Optional[int]:
+    """Read the photo taken time from a JSON metadata file, without the cache."""
+    try:
+        if data is None:
+            data = read_file_bytes(json_path)
+        
+        # Fast path: take photoTakenTime straight from the raw bytes and skip the JSON parse
+        match = PHOTO_TAKEN_TIME_RE.search(data)
+        if match:
+            return int(match.group(1))
+        
+        metadata = parse_json(data)
         
         # Try to find the photo taken time in the metadata
         if 'photoTakenTime' in metadata:
             timestamp = metadata['photoTakenTime'].get('timestamp')
-            formatted_time = metadata['photoTakenTime'].get('formatted', '')
-            
             if timestamp:
-                # Check if the formatted time contains timezone information or if force_utc is enabled
-                use_utc = force_utc or 'UTC' in formatted_time
-                
-                # Convert Unix timestamp to ISO format
-                # Use UTC if the formatted time contains UTC or force_utc is enabled, otherwise use local timezone
-                if use_utc:
-                    try:
-                        # Use the recommended approach for Python 3.11+
-                        from datetime import UTC
-                        dt_obj = datetime.fromtimestamp(int(timestamp), UTC)
-                    except ImportError:
-                        # Fallback for older Python versions
-                        import datetime as dt
-                        dt_obj = dt.datetime.utcfromtimestamp(int(timestamp))
-                else:
-                    dt_obj = datetime.fromtimestamp(int(timestamp))
-                
-                # Debug output for specific problematic file
-                if "IMG_0538.JPG" in json_path:
-                    print(f"{Colors.YELLOW}Timestamp: {timestamp}, Formatted: {formatted_time}{Colors.ENDC}")
-                    print(f"{Colors.YELLOW}Using {'UTC' if use_utc else 'local timezone'} (force_utc={force_utc}){Colors.ENDC}")
-                    print(f"{Colors.YELLOW}Converted to: {dt_obj} (ISO: {dt_obj.isoformat()}){Colors.ENDC}")
-                
-                return dt_obj.isoformat()
+                return int(timestamp)
         
         # Alternative fields to check
         if 'creationTime' in metadata:
             timestamp = metadata['creationTime'].get('timestamp')
-            formatted_time = metadata['creationTime'].get('formatted', '')
-            
             if timestamp:
-                # Check if the formatted time contains timezone information or if force_utc is enabled
-                use_utc = force_utc or 'UTC' in formatted_time
-                
-                # Convert Unix timestamp to ISO format
-                # Use UTC if the formatted time contains UTC or force_utc is enabled, otherwise use local timezone
-                if use_utc:
-                    try:
-                        # Use the recommended approach for Python 3.11+
-                        from datetime import UTC
-                        dt_obj = datetime.fromtimestamp(int(timestamp), UTC)
-                    except ImportError:
-                        # Fallback for older Python versions
-                        import datetime as dt
-                        dt_obj = dt.datetime.utcfromtimestamp(int(timestamp))
-                else:
-                    dt_obj = datetime.fromtimestamp(int(timestamp))
-                
-                # Debug output for specific problematic file
-                if "IMG_0538.JPG" in json_path:
-                    print(f"{Colors.YELLOW}Using creationTime fallback{Colors.ENDC}")
-                    print(f"{Colors.YELLOW}Timestamp: {timestamp}, Formatted: {formatted_time}{Colors.ENDC}")
-                    print(f"{Colors.YELLOW}Using {'UTC' if use_utc else 'local timezone'} (force_utc={force_utc}){Colors.ENDC}")
-                    print(f"{Colors.YELLOW}Converted to: {dt_obj} (ISO: {dt_obj.isoformat()}){Colors.ENDC}")
-                
-                return dt_obj.isoformat()
-        
-        # Debug output for specific problematic file
-        if "IMG_0538.JPG" in json_path:
-            print(f"{Colors.RED}No valid timestamp found in metadata!{Colors.ENDC}")
+                return int(timestamp)
         
         return None
     except Exception as e:
         print(f"Error reading JSON metadata: {e}")
-        if "IMG_0538.JPG" in json_path:
-            print(f"{Colors.RED}Exception while processing problematic file: {e}{Colors.ENDC}")
         return None
 
 
-def update_windows_file_dates_direct(file_path: str, dt: datetime, quiet_mode: bool = False, debug_mode: bool = False) -> bool:
-    """Update file dates on Windows using win32file directly."""
+def update_file_dates(file_path: str, timestamp: int, quiet_mode: bool = False, debug_mode: bool = False) -> bool:
+    """Update the file creation and modification dates from a Unix timestamp."""
     try:
-        import win32file
-        import pywintypes
-        
-        # Convert datetime to Windows file time
-        win_time = pywintypes.Time(dt)
-        
-        # Open the file
-        handle = win32file.CreateFile(
-            file_path,
-            win32file.GENERIC_WRITE,
-            win32file.FILE_SHARE_READ | win32file.FILE_SHARE_WRITE,
-            None,
-            win32file.OPEN_EXISTING,
-            win32file.FILE_ATTRIBUTE_NORMAL,
-            None
-        )
-        
-        # Set the file times
-        win32file.SetFileTime(handle, win_time, win_time, win_time)
-        
-        # Close the handle
-        win32file.CloseHandle(handle)
-        
-        return True
-    except Exception as e:
-        if not quiet_mode:
-            print(f"Error in direct Windows file date update: {e}")
-        return False
-
-
-def update_file_dates(file_path: str, time_taken: str, quiet_mode: bool = False, debug_mode: bool = False) -> bool:
-    """Update the file creation and modification dates."""
-    try:
-        # Convert ISO format to datetime
-        dt = datetime.fromisoformat(time_taken)
-        
-        # Debug output for problematic files
-        if debug_mode and ("IMG_0624(1).MOV" in file_path or "IMG_0538.JPG" in file_path):
-            print(f"\n{Colors.YELLOW}DEBUG - Updating dates for: {os.path.basename(file_path)}{Colors.ENDC}")
-            print(f"{Colors.YELLOW}Target datetime: {dt}{Colors.ENDC}")
-            
-            # Get current file dates before update
-            file_stat = os.stat(file_path)
-            modified_time_before = datetime.fromtimestamp(file_stat.st_mtime)
-            if hasattr(file_stat, 'st_ctime'):
-                creation_time_before = datetime.fromtimestamp(file_stat.st_ctime)
-                print(f"{Colors.YELLOW}Current creation time: {creation_time_before}{Colors.ENDC}")
-            print(f"{Colors.YELLOW}Current modification time: {modified_time_before}{Colors.ENDC}")
-        
         success = False
         if IS_WINDOWS:
-            # Try direct method first
-            if debug_mode:
-                print(f"{Colors.YELLOW}Trying direct win32file method first...{Colors.ENDC}")
-            success = update_windows_file_dates_direct(file_path, dt, quiet_mode, debug_mode)
-            
-            # If direct method fails, fall back to PowerShell
-            if not success:
-                if debug_mode:
-                    print(f"{Colors.YELLOW}Direct method failed, falling back to PowerShell...{Colors.ENDC}")
-                success = update_windows_file_dates(file_path, dt, quiet_mode, debug_mode)
+            success = update_windows_file_dates(file_path, timestamp, quiet_mode, debug_mode)
         else:
-            # For non-Windows platforms, just set the modification time
-            timestamp = dt.timestamp()
-            os.utime(file_path, (timestamp, timestamp))
+            # For non-Windows platforms, just set the access and modification times.
+            # Integer nanoseconds keep the whole-second timestamp exact
+            timestamp_ns = timestamp * 1_000_000_000
+            os.utime(file_path, ns=(timestamp_ns, timestamp_ns))
             success = True
         
-        # Verify that the dates were actually updated
-        if success and debug_mode and ("IMG_0624(1).MOV" in file_path or "IMG_0538.JPG" in file_path):
-            # Get file dates after update
-            file_stat = os.stat(file_path)
-            modified_time_after = datetime.fromtimestamp(file_stat.st_mtime)
-            if hasattr(file_stat, 'st_ctime'):
-                creation_time_after = datetime.fromtimestamp(file_stat.st_ctime)
-                print(f"{Colors.YELLOW}New creation time: {creation_time_after}{Colors.ENDC}")
-            print(f"{Colors.YELLOW}New modification time: {modified_time_after}{Colors.ENDC}")
-            
-            # Check if the dates were updated correctly
-            if hasattr(file_stat, 'st_ctime'):
-                creation_time_diff = abs((creation_time_after - dt).total_seconds())
-                print(f"{Colors.YELLOW}Creation time difference: {creation_time_diff} seconds{Colors.ENDC}")
-                if creation_time_diff > 60:  # Allow 1 minute difference
-                    print(f"{Colors.RED}Warning: Creation time was not updated correctly!{Colors.ENDC}")
-            
-            modification_time_diff = abs((modified_time_after - dt).total_seconds())
-            print(f"{Colors.YELLOW}Modification time difference: {modification_time_diff} seconds{Colors.ENDC}")
-            if modification_time_diff > 60:  # Allow 1 minute difference
-                print(f"{Colors.RED}Warning: Modification time was not updated correctly!{Colors.ENDC}")
-        
         return success
     except Exception as e:
         if not quiet_mode:
@@ -892,96 +1351,174 @@ def update_file_dates(file_path: str, time_taken: str, quiet_mode: bool = False,
         return False
 
 
-def update_windows_file_dates(file_path: str, dt: datetime, quiet_mode: bool = False, debug_mode: bool = False) -> bool:
-    """Update file dates on Windows using PowerShell."""
-    max_retries = 3
-    retry_delay = 2  # seconds
-    
-    for attempt in range(max_retries):
-        try:
-            # Create a temporary PowerShell script file
-            ps_file = os.path.join(tempfile.gettempdir(), f"set_dates_{os.getpid()}_{attempt}.ps1")
-            
-            # Format date for PowerShell
-            ps_date = dt.strftime("%m/%d/%Y %H:%M:%S")
-            
-            # PowerShell script content
-            ps_script = f"""
-# Get the file path
-$filePath = "{file_path.replace('"', '`"')}"
-
-# Use .NET Framework method (most reliable)
-[System.IO.File]::SetCreationTime($filePath, "{ps_date}")
-[System.IO.File]::SetLastWriteTime($filePath, "{ps_date}")
-[System.IO.File]::SetLastAccessTime($filePath, "{ps_date}")
-
-# Verify the change
-$file = Get-Item -LiteralPath $filePath -Force
-if ($file.CreationTime.ToString("MM/dd/yyyy HH:mm:ss") -ne "{ps_date}") {{
-    # If verification fails, try again with direct property assignment
-    $file.CreationTime = "{ps_date}"
-    $file.LastWriteTime = "{ps_date}"
-    $file.LastAccessTime = "{ps_date}"
-}}
-"""
-            
-            # Write PowerShell commands to the script file
-            with open(ps_file, 'w') as f:
-                f.write(ps_script)
-            
-            # Execute the PowerShell script with a longer timeout
-            result = subprocess.run(['powershell', '-ExecutionPolicy', 'Bypass', '-File', ps_file], 
-                          check=False, timeout=60, capture_output=True, text=True)
-            
-            # Clean up the temporary script file
+def update_windows_file_dates(file_path: str, timestamp: int, quiet_mode: bool = False, debug_mode: bool = False) -> bool:
+    """Update file dates on Windows using an attribute-only win32file handle."""
+    try:
+        # Build the Windows file time straight from the Unix timestamp
+        win_time = pywintypes.Time(timestamp)
+        
+        for attempt in range(WINDOWS_DATE_RETRIES + 1):
             try:
-                os.remove(ps_file)
-            except:
-                pass
-            
-            if result.returncode == 0:
-                return True
-            
-            # If we're here, the command failed but didn't raise an exception
-            if attempt < max_retries - 1:
-                if not quiet_mode:
-                    print(f"PowerShell execution failed (attempt {attempt + 1}/{max_retries}), retrying in {retry_delay} seconds...")
-                import time
-                time.sleep(retry_delay)
-            
-        except subprocess.TimeoutExpired:
-            if attempt < max_retries - 1:
-                if not quiet_mode:
-                    print(f"PowerShell execution timed out (attempt {attempt + 1}/{max_retries}), retrying in {retry_delay} seconds...")
-                import time
-                time.sleep(retry_delay)
-            else:
-                # Always print critical errors, even in quiet mode
-                print(f"PowerShell execution timed out after {max_retries} attempts")
-                return False
-        except Exception as e:
-            if not quiet_mode or attempt == max_retries - 1:
-                print(f"Error in PowerShell execution (attempt {attempt + 1}/{max_retries}): {e}")
-            if attempt < max_retries - 1:
-                import time
-                time.sleep(retry_delay)
-            else:
-                return False
-    
-    return False
+                # Setting file times only needs FILE_WRITE_ATTRIBUTES, which also works on read-only files
+                handle = win32file.CreateFile(
+                    file_path,
+                    win32con.FILE_WRITE_ATTRIBUTES,
+                    win32con.FILE_SHARE_READ | win32con.FILE_SHARE_WRITE | win32con.FILE_SHARE_DELETE,
+                    None,
+                    win32con.OPEN_EXISTING,
+                    win32con.FILE_FLAG_BACKUP_SEMANTICS,
+                    None
+                )
+                break
+            except pywintypes.error as e:
+                # A virus scanner or the search indexer can hold a freshly copied file
+                # for a moment, wait briefly and try again instead of failing the file
+                if e.winerror not in WINDOWS_RETRY_ERRORS or attempt == WINDOWS_DATE_RETRIES:
+                    raise
+                time.sleep(0.05 * 2 ** attempt)
+        
+        try:
+            # Set creation, access and modification times in a single call
+            win32file.SetFileTime(handle, win_time, win_time, win_time)
+        finally:
+            win32file.CloseHandle(handle)
+        
+        return True
+    except Exception as e:
+        # Always print critical errors, even in quiet mode
+        print(f"Error in Windows file date update: {e}")
+        return False
 
 
 def print_progress_bar(current, total):
     """Print a progress bar to show processing status."""
-    percent = ("{0:.1f}").format(100 * (current / float(total)))
-    length = 50
+    now = time.monotonic()
+    if current != total and now - _last_progress_time[0] < PROGRESS_INTERVAL:
+        return
+    _last_progress_time[0] = now
+    
+    length = PROGRESS_BAR_LENGTH
     filled_length = int(length * current // total)
-    bar = '█' * filled_length + '-' * (length - filled_length)
-    print(f'\r{Colors.BOLD}Progress:{Colors.ENDC} |{Colors.CYAN}{bar}{Colors.ENDC}| {percent}% {Colors.BOLD}{current}/{total}{Colors.ENDC}', end='', flush=True)
+    bar = _PROGRESS_FULL[:filled_length] + _PROGRESS_EMPTY[:length - filled_length]
+    print(_PROGRESS_FORMAT % (bar, 100 * (current / float(total)), current, total), end='', flush=True)
     if current == total:
         print()
 
-def process_media_file(media_file: Dict[str, Any], output_dir: str, error_dir: str, input_dir: str, debug_mode: bool = False, all_media_files: List[Dict[str, Any]] = None, quiet_mode: bool = False, force_utc: bool = False) -> Dict[str, Any]:
+def relative_dir(dir_path: str, input_dir: str) -> str:
+    """Return a directory's path relative to the input directory ('' for the input directory itself)."""
+    rel_dir = _relative_dirs.get(dir_path)
+    if rel_dir is None:
+        rel_dir = os.path.relpath(dir_path, input_dir)
+        if rel_dir == os.curdir:
+            rel_dir = ''
+        _relative_dirs[dir_path] = rel_dir
+    return rel_dir
+
+
+def ensure_dir(dir_path: str) -> None:
+    """Create a directory once per run, skipping makedirs for directories already created."""
+    if dir_path in _created_dirs:
+        return
+    # makedirs tolerates other threads racing to create the same directory,
+    # and set.add is atomic under the GIL, so no lock is needed
+    os.makedirs(dir_path, exist_ok=True)
+    _created_dirs.add(dir_path)
+
+
+def reflink_file(src_fd: int, dst_fd: int, devices: Tuple[int, int]) -> bool:
+    """Clone a file's extents with a copy-on-write reflink, returning whether it worked."""
+    global _reflink_supported
+    if not _reflink_supported or devices in _reflink_unsupported_devices:
+        return False
+    try:
+        import fcntl
+        fcntl.ioctl(dst_fd, FICLONE, src_fd)
+        return True
+    except ImportError:
+        _reflink_supported = False
+    except OSError as e:
+        # Stop trying on these drives once their filesystems tell us reflinks are not available
+        if e.errno in (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY):
+            _reflink_unsupported_devices.add(devices)
+    return False
+
+
+def copy_file_range_file(src_fd: int, dst_fd: int, size: int, devices: Tuple[int, int]) -> bool:
+    """
+    Let the kernel copy the data without passing it through user space; on NFS and SMB
+    mounts the server can even do the copy itself. Returns whether the whole file was copied.
+    """
+    global _copy_file_range_supported
+    if not _copy_file_range_supported or devices in _copy_file_range_unsupported_devices:
+        return False
+    remaining = size
+    try:
+        while remaining > 0:
+            copied = os.copy_file_range(src_fd, dst_fd, remaining)
+            if not copied:
+                break
+            remaining -= copied
+    except OSError as e:
+        # Without the system call no copy can use it, otherwise only these drives are skipped
+        if e.errno == errno.ENOSYS:
+            _copy_file_range_supported = False
+        elif e.errno in (errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.EPERM):
+            _copy_file_range_unsupported_devices.add(devices)
+        return False
+    return remaining <= 0
+
+
+def fast_copy(src: str, dst: str, link_files: bool = False, copy_dates: bool = True) -> bool:
+    """
+    Copy a media file using the cheapest method available.
+    Tries a hardlink (only when link_files is enabled), then a copy-on-write
+    reflink, an in-kernel copy_file_range or the Windows CopyFile API, and finally
+    falls back to shutil.copy2.
+    With copy_dates off the source dates and permissions are not copied, for
+    callers that set the file dates themselves straight after.
+    Returns True if dst was hardlinked to src, False if it is a separate copy.
+    """
+    # Hardlinks share the inode, so later date updates also change the source file
+    if link_files:
+        try:
+            os.link(src, dst)
+            return True
+        except OSError:
+            # Different device or links not supported, copy instead
+            pass
+    
+    if _reflink_supported or _copy_file_range_supported:
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                src_stat = os.fstat(fsrc.fileno())
+                devices = (src_stat.st_dev, os.fstat(fdst.fileno()).st_dev)
+                copied = (reflink_file(fsrc.fileno(), fdst.fileno(), devices) or
+                          copy_file_range_file(fsrc.fileno(), fdst.fileno(), src_stat.st_size, devices))
+            if copied:
+                if copy_dates:
+                    shutil.copystat(src, dst)
+                return False
+        except OSError:
+            pass
+    
+    # Let Windows copy the file itself; CopyFile keeps the timestamps and attributes
+    # like copy2, and can block-clone on ReFS volumes
+    if IS_WINDOWS:
+        try:
+            win32file.CopyFile(src, dst, False)
+            return False
+        except Exception:
+            pass
+    
+    # Python 3.8+ already uses sendfile (Linux) or fcopyfile (macOS) here
+    if copy_dates:
+        shutil.copy2(src, dst)
+    else:
+        shutil.copyfile(src, dst)
+    return False
+
+
+def process_media_file(media_file: Dict[str, Any], output_dir: str, error_dir: str, input_dir: str, debug_mode: bool = False, quiet_mode: bool = False, link_files: bool = False) -> Dict[str, Any]:
     """Process a single media file."""
     result = {
         'success': False,
@@ -992,86 +1529,112 @@ def process_media_file(media_file: Dict[str, Any], output_dir: str, error_dir: s
         'date_not_updated': False,
         'gps_updated': False,
         'no_gps_metadata': False,
-        'description_updated': False
+        'description_updated': False,
+        'time_taken': None,
+        'json_path': None,
+        'output_path': None
     }
     
     try:
         # Determine the output path
-        rel_path = os.path.relpath(media_file['media_path'], input_dir)
+        rel_path = os.path.join(relative_dir(media_file['dir_path'], input_dir), media_file['filename'])
         output_path = os.path.join(output_dir, rel_path)
         
         # Create the output directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        ensure_dir(os.path.dirname(output_path))
+        
+        # Read the photo taken time before copying (a companion uses its primary's
+        # metadata). When it is known the copy skips the source dates, which would
+        # be overwritten straight away
+        is_companion = media_file['is_companion'] and media_file['companion_path']
+        metadata_json_path = media_file['companion_json_path'] if is_companion else media_file['json_path']
+        
+        # Images also need the JSON for their GPS and description, so read it once
+        # here and share the bytes with both steps
+        json_data = None
+        updates_exif = HAS_PIL and media_file['extension'] in IMAGE_EXTENSIONS
+        if updates_exif and metadata_json_path and not is_companion:
+            try:
+                json_data = read_file_bytes(metadata_json_path)
+            except OSError:
+                json_data = None
+        time_taken = read_photo_taken_ts(metadata_json_path, json_data)
+        
+        # Work out the GPS and description updates for images before copying, from the
+        # source file's EXIF (the copy is identical)
+        exif_gps = None
+        exif_description = None
+        if updates_exif and not is_companion:
+            # Parse the JSON metadata once for both the GPS and description lookups,
+            # reusing the bytes read for the photo taken time
+            metadata = None
+            if media_file['json_path']:
+                try:
+                    metadata = parse_json(json_data) if json_data is not None else load_json_file(media_file['json_path'])
+                except Exception:
+                    metadata = None
+            
+            # Check if the file has valid GPS data, and read its description in the same pass
+            existing_gps, existing_description = read_exif(media_file['media_path'])
+            
+            # If no valid GPS data, try to get GPS from the JSON metadata
+            if not existing_gps:
+                exif_gps = get_gps_from_json(metadata) if metadata else None
+                if not exif_gps:
+                    # Track files without GPS metadata in either EXIF or JSON
+                    result['no_gps_metadata'] = True
+            
+            # Update description from JSON if available, unless the image already carries it
+            if metadata:
+                description = get_description_from_json(metadata, media_file['filename'])
+                if description and description != existing_description:
+                    exif_description = description
+        
+        # Without exiftool, JPEGs that need new EXIF data are patched while they are
+        # copied, so the image is written once instead of copied and then rewritten
+        exif_written = None
+        if (exif_gps or exif_description) and not EXIFTOOL_PATH and not link_files:
+            exif_written = copy_and_patch_jpeg(media_file['media_path'], output_path, exif_gps, exif_description)
+            if exif_written and time_taken is None:
+                shutil.copystat(media_file['media_path'], output_path)
         
         # Copy the file to the output directory
-        shutil.copy2(media_file['media_path'], output_path)
+        linked = False
+        if not exif_written:
+            linked = fast_copy(media_file['media_path'], output_path, link_files, copy_dates=time_taken is None)
         result['success'] = True
         
         # Check if this is a companion file
-        if media_file['is_companion'] and media_file['companion_path']:
+        if is_companion:
             result['is_companion'] = True
-            # Get the relative path of the companion file
-            companion_rel_path = os.path.relpath(media_file['companion_path'], input_dir)
-            companion_output_path = os.path.join(output_dir, companion_rel_path)
             
             # For Live Photos, we should try to update the dates even for companion files
             # This ensures both parts of a Live Photo have the same date
             
-            # First check if the companion file has metadata
-            companion_json_path = None
-            for other_file in all_media_files:
-                if other_file['media_path'] == media_file['companion_path']:
-                    companion_json_path = other_file['json_path']
-                    break
-            
-            if companion_json_path:
-                # Try to get the timestamp from the companion's metadata
-                time_taken = read_photo_taken_time(companion_json_path, force_utc)
-                if time_taken:
-                    # Update this file's dates with the companion's timestamp
-                    if update_file_dates(output_path, time_taken, quiet_mode, debug_mode):
-                        result['dates_updated'] = True
-                        if debug_mode:
-                            print(f"{Colors.GREEN}Updated companion file date from primary file: {os.path.basename(output_path)}{Colors.ENDC}")
+            # Use the timestamp from the primary file's metadata, if it had one
+            if time_taken is not None:
+                # Update this file's dates with the companion's timestamp
+                if update_file_dates(output_path, time_taken, quiet_mode, debug_mode):
+                    result['dates_updated'] = True
+                    if debug_mode:
+                        print(f"{Colors.GREEN}Updated companion file date from primary file: {os.path.basename(output_path)}{Colors.ENDC}")
             
             return result
         
-        # Read the photo taken time from the JSON metadata
-        time_taken = None
+        # The photo taken time was read from the JSON metadata before the copy
         if media_file['json_path']:
             result['has_metadata'] = True
-            time_taken = read_photo_taken_time(media_file['json_path'], force_utc)
-            
-            # Debug output for problematic files
-            if debug_mode and "IMG_0624(1).MOV" in media_file['filename']:
-                print(f"\n{Colors.YELLOW}DEBUG - Processing problematic file: {media_file['filename']}{Colors.ENDC}")
-                print(f"{Colors.YELLOW}JSON path: {media_file['json_path']}{Colors.ENDC}")
-                print(f"{Colors.YELLOW}Time taken from JSON: {time_taken}{Colors.ENDC}")
-                
-                # Read the JSON file directly to see its contents
-                try:
-                    with open(media_file['json_path'], 'r', encoding='utf-8') as f:
-                        metadata = json.load(f)
-                        print(f"{Colors.YELLOW}JSON metadata:{Colors.ENDC}")
-                        if 'photoTakenTime' in metadata:
-                            print(f"photoTakenTime: {metadata['photoTakenTime']}")
-                        if 'creationTime' in metadata:
-                            print(f"creationTime: {metadata['creationTime']}")
-                        if 'modificationTime' in metadata:
-                            print(f"modificationTime: {metadata['modificationTime']}")
-                except Exception as e:
-                    print(f"{Colors.RED}Error reading JSON file: {e}{Colors.ENDC}")
         else:
             # If no metadata and this is a video file, look for a corresponding image file with metadata
             # Common Apple Live Photo pairs: HEIC+MP4, JPG+MOV, JPG+MP4, JPEG+MP4, etc.
-            if media_file['extension'].lower() in ['.mp4', '.mov']:
+            if media_file['extension'] in ('.mp4', '.mov'):
                 if debug_mode:
                     print(f"\n{Colors.YELLOW}No metadata found for video file: {media_file['filename']}{Colors.ENDC}")
                     print(f"{Colors.YELLOW}Looking for companion image files...{Colors.ENDC}")
                 
                 # Get the base name without extension
-                base_name = os.path.splitext(os.path.basename(media_file['media_path']))[0]
-                dir_path = os.path.dirname(media_file['media_path'])
+                base_name = media_file['filename'][:-len(media_file['extension'])]
+                dir_path = media_file['dir_path']
                 
                 # Try multiple approaches to find companion images
                 found_metadata = False
@@ -1082,7 +1645,7 @@ def process_media_file(media_file: Dict[str, Any], output_dir: str, error_dir: s
                 # 1. First approach: Look for exact base name matches
                 for img_ext in ['.jpg', '.jpeg', '.heic']:
                     img_path = os.path.join(dir_path, base_name + img_ext)
-                    if os.path.exists(img_path):
+                    if listed_path_exists(img_path):
                         potential_companions.append(img_path)
                         if debug_mode:
                             print(f"{Colors.GREEN}Found potential companion image: {img_path}{Colors.ENDC}")
@@ -1090,146 +1653,64 @@ def process_media_file(media_file: Dict[str, Any], output_dir: str, error_dir: s
                 # 1b. Also check for other video files with the same base name
                 # This handles cases where there are both MP4 and MOV files for the same photo
                 other_video_exts = ['.mp4', '.mov']
-                current_ext = media_file['extension'].lower()
+                current_ext = media_file['extension']
                 for video_ext in other_video_exts:
                     if video_ext != current_ext:  # Don't check the current file's extension
                         video_path = os.path.join(dir_path, base_name + video_ext)
-                        if os.path.exists(video_path):
+                        if listed_path_exists(video_path):
                             if debug_mode:
                                 print(f"{Colors.YELLOW}Found another video file with same base name: {video_path}{Colors.ENDC}")
                             
                             # Check if this video file has metadata
-                            video_json_path1 = video_path + '.json'
-                            video_json_path2 = video_path + '.suppl.json'
-                            video_json_path3 = video_path + '.supplemental-metadata.json'
-                            video_json_path4 = os.path.splitext(video_path)[0] + '.json'
-                            
-                            if os.path.exists(video_json_path1):
-                                media_file['json_path'] = video_json_path1
-                                result['has_metadata'] = True
-                                time_taken = read_photo_taken_time(video_json_path1, force_utc)
-                                found_metadata = True
-                                if debug_mode:
-                                    print(f"{Colors.GREEN}Using metadata from companion video: {video_json_path1}{Colors.ENDC}")
-                                break
-                            elif os.path.exists(video_json_path2):
-                                media_file['json_path'] = video_json_path2
+                            video_json_path = find_json_sidecar(video_path, exists=listed_path_exists)
+                            if video_json_path:
+                                media_file['json_path'] = video_json_path
                                 result['has_metadata'] = True
-                                time_taken = read_photo_taken_time(video_json_path2, force_utc)
+                                time_taken = read_photo_taken_ts(video_json_path)
                                 found_metadata = True
                                 if debug_mode:
-                                    print(f"{Colors.GREEN}Using metadata from companion video: {video_json_path2}{Colors.ENDC}")
-                                break
-                            elif os.path.exists(video_json_path3):
-                                media_file['json_path'] = video_json_path3
-                                result['has_metadata'] = True
-                                time_taken = read_photo_taken_time(video_json_path3, force_utc)
-                                found_metadata = True
-                                if debug_mode:
-                                    print(f"{Colors.GREEN}Using metadata from companion video: {video_json_path3}{Colors.ENDC}")
-                                break
-                            elif os.path.exists(video_json_path4):
-                                media_file['json_path'] = video_json_path4
-                                result['has_metadata'] = True
-                                time_taken = read_photo_taken_time(video_json_path4, force_utc)
-                                found_metadata = True
-                                if debug_mode:
-                                    print(f"{Colors.GREEN}Using metadata from companion video: {video_json_path4}{Colors.ENDC}")
+                                    print(f"{Colors.GREEN}Using metadata from companion video: {video_json_path}{Colors.ENDC}")
                                 break
                         
                 # Check for JSON metadata for each potential companion image
                 for img_path in potential_companions:
-                    img_json_path1 = img_path + '.json'
-                    img_json_path2 = img_path + '.suppl.json'
-                    img_json_path3 = img_path + '.supplemental-metadata.json'
-                    img_json_path4 = os.path.splitext(img_path)[0] + '.json'
-                    
-                    if os.path.exists(img_json_path1):
-                        media_file['json_path'] = img_json_path1
+                    img_json_path = find_json_sidecar(img_path, exists=listed_path_exists)
+                    if img_json_path:
+                        media_file['json_path'] = img_json_path
                         result['has_metadata'] = True
-                        time_taken = read_photo_taken_time(img_json_path1, force_utc)
+                        time_taken = read_photo_taken_ts(img_json_path)
                         found_metadata = True
                         if debug_mode:
-                            print(f"{Colors.GREEN}Using metadata from companion image: {img_json_path1}{Colors.ENDC}")
-                        break
-                    elif os.path.exists(img_json_path2):
-                        media_file['json_path'] = img_json_path2
-                        result['has_metadata'] = True
-                        time_taken = read_photo_taken_time(img_json_path2, force_utc)
-                        found_metadata = True
-                        if debug_mode:
-                            print(f"{Colors.GREEN}Using metadata from companion image: {img_json_path2}{Colors.ENDC}")
-                        break
-                    elif os.path.exists(img_json_path3):
-                        media_file['json_path'] = img_json_path3
-                        result['has_metadata'] = True
-                        time_taken = read_photo_taken_time(img_json_path3, force_utc)
-                        found_metadata = True
-                        if debug_mode:
-                            print(f"{Colors.GREEN}Using metadata from companion image: {img_json_path3}{Colors.ENDC}")
-                        break
-                    elif os.path.exists(img_json_path4):
-                        media_file['json_path'] = img_json_path4
-                        result['has_metadata'] = True
-                        time_taken = read_photo_taken_time(img_json_path4, force_utc)
-                        found_metadata = True
-                        if debug_mode:
-                            print(f"{Colors.GREEN}Using metadata from companion image: {img_json_path4}{Colors.ENDC}")
+                            print(f"{Colors.GREEN}Using metadata from companion image: {img_json_path}{Colors.ENDC}")
                         break
                     
                     # Also try with 'E' prefix (common in Apple Live Photos)
                     if not found_metadata and not base_name.startswith('IMG_E') and base_name.startswith('IMG_'):
                         e_base_name = 'IMG_E' + base_name[4:]
                         img_path = os.path.join(dir_path, e_base_name + img_ext)
-                        if os.path.exists(img_path):
+                        if listed_path_exists(img_path):
                             if debug_mode:
                                 print(f"{Colors.GREEN}Found potential companion image with E prefix: {img_path}{Colors.ENDC}")
                             
                             # Check for JSON metadata for the image file
-                            img_json_path1 = img_path + '.json'
-                            img_json_path2 = img_path + '.suppl.json'
-                            img_json_path3 = img_path + '.supplemental-metadata.json'
-                            img_json_path4 = os.path.splitext(img_path)[0] + '.json'
-                            
-                            if os.path.exists(img_json_path1):
-                                media_file['json_path'] = img_json_path1
+                            img_json_path = find_json_sidecar(img_path, exists=listed_path_exists)
+                            if img_json_path:
+                                media_file['json_path'] = img_json_path
                                 result['has_metadata'] = True
-                                time_taken = read_photo_taken_time(img_json_path1, force_utc)
+                                time_taken = read_photo_taken_ts(img_json_path)
                                 found_metadata = True
                                 if debug_mode:
-                                    print(f"{Colors.GREEN}Using metadata from E-prefix companion image: {img_json_path1}{Colors.ENDC}")
-                                break
-                            elif os.path.exists(img_json_path2):
-                                media_file['json_path'] = img_json_path2
-                                result['has_metadata'] = True
-                                time_taken = read_photo_taken_time(img_json_path2, force_utc)
-                                found_metadata = True
-                                if debug_mode:
-                                    print(f"{Colors.GREEN}Using metadata from E-prefix companion image: {img_json_path2}{Colors.ENDC}")
-                                break
-                            elif os.path.exists(img_json_path3):
-                                media_file['json_path'] = img_json_path3
-                                result['has_metadata'] = True
-                                time_taken = read_photo_taken_time(img_json_path3, force_utc)
-                                found_metadata = True
-                                if debug_mode:
-                                    print(f"{Colors.GREEN}Using metadata from E-prefix companion image: {img_json_path3}{Colors.ENDC}")
-                                break
-                            elif os.path.exists(img_json_path4):
-                                media_file['json_path'] = img_json_path4
-                                result['has_metadata'] = True
-                                time_taken = read_photo_taken_time(img_json_path4, force_utc)
-                                found_metadata = True
-                                if debug_mode:
-                                    print(f"{Colors.GREEN}Using metadata from E-prefix companion image: {img_json_path4}{Colors.ENDC}")
+                                    print(f"{Colors.GREEN}Using metadata from E-prefix companion image: {img_json_path}{Colors.ENDC}")
                                 break
                 
                 # 2. Second approach: If still no metadata, look for files with similar names in the directory
                 if not found_metadata:
-                    # Get all image files in the directory
+                    # Get all image files in the directory, from the scan when it listed them
                     try:
-                        dir_files = os.listdir(dir_path)
-                        image_files = [f for f in dir_files if f.lower().endswith(('.jpg', '.jpeg', '.heic'))]
+                        image_files = media_file['dir_image_names']
+                        if image_files is None:
+                            dir_files = os.listdir(dir_path)
+                            image_files = [f for f in dir_files if f.lower().endswith(('.jpg', '.jpeg', '.heic'))]
                         
                         if debug_mode and image_files:
                             print(f"{Colors.YELLOW}Looking for similar named image files in directory...{Colors.ENDC}")
@@ -1249,42 +1730,14 @@ def process_media_file(media_file: Dict[str, Any], output_dir: str, error_dir: s
                                     print(f"{Colors.GREEN}Found potential similar-named companion image: {img_path}{Colors.ENDC}")
                                 
                                 # Check for JSON metadata for this image file
-                                img_json_path1 = img_path + '.json'
-                                img_json_path2 = img_path + '.suppl.json'
-                                img_json_path3 = img_path + '.supplemental-metadata.json'
-                                img_json_path4 = os.path.splitext(img_path)[0] + '.json'
-                                
-                                if os.path.exists(img_json_path1):
-                                    media_file['json_path'] = img_json_path1
+                                img_json_path = find_json_sidecar(img_path, exists=listed_path_exists)
+                                if img_json_path:
+                                    media_file['json_path'] = img_json_path
                                     result['has_metadata'] = True
-                                    time_taken = read_photo_taken_time(img_json_path1, force_utc)
+                                    time_taken = read_photo_taken_ts(img_json_path)
                                     found_metadata = True
                                     if debug_mode:
-                                        print(f"{Colors.GREEN}Using metadata from similar-named companion: {img_json_path1}{Colors.ENDC}")
-                                    break
-                                elif os.path.exists(img_json_path2):
-                                    media_file['json_path'] = img_json_path2
-                                    result['has_metadata'] = True
-                                    time_taken = read_photo_taken_time(img_json_path2, force_utc)
-                                    found_metadata = True
-                                    if debug_mode:
-                                        print(f"{Colors.GREEN}Using metadata from similar-named companion: {img_json_path2}{Colors.ENDC}")
-                                    break
-                                elif os.path.exists(img_json_path3):
-                                    media_file['json_path'] = img_json_path3
-                                    result['has_metadata'] = True
-                                    time_taken = read_photo_taken_time(img_json_path3, force_utc)
-                                    found_metadata = True
-                                    if debug_mode:
-                                        print(f"{Colors.GREEN}Using metadata from similar-named companion: {img_json_path3}{Colors.ENDC}")
-                                    break
-                                elif os.path.exists(img_json_path4):
-                                    media_file['json_path'] = img_json_path4
-                                    result['has_metadata'] = True
-                                    time_taken = read_photo_taken_time(img_json_path4, force_utc)
-                                    found_metadata = True
-                                    if debug_mode:
-                                        print(f"{Colors.GREEN}Using metadata from similar-named companion: {img_json_path4}{Colors.ENDC}")
+                                        print(f"{Colors.GREEN}Using metadata from similar-named companion: {img_json_path}{Colors.ENDC}")
                                     break
                     except Exception as e:
                         if debug_mode:
@@ -1292,52 +1745,27 @@ def process_media_file(media_file: Dict[str, Any], output_dir: str, error_dir: s
         
         # Update the file dates if we have a time taken
         date_updated = False
-        if time_taken:
+        if time_taken is not None:
             if update_file_dates(output_path, time_taken, quiet_mode, debug_mode):
                 result['dates_updated'] = True
                 date_updated = True
-                
-                # If this file has companions, update their dates too
-                if all_media_files:
-                    for other_file in all_media_files:
-                        if other_file.get('is_companion') and other_file.get('companion_path') == media_file['media_path']:
-                            # Get the output path for the companion
-                            companion_rel_path = os.path.relpath(other_file['media_path'], input_dir)
-                            companion_output_path = os.path.join(output_dir, companion_rel_path)
-                            
-                            # Update the companion's dates with the same timestamp
-                            if os.path.exists(companion_output_path):
-                                update_file_dates(companion_output_path, time_taken, quiet_mode, debug_mode)
-        
-        # Update GPS data and description for image files if Pillow is available
-        if HAS_PIL and media_file['extension'].lower() in IMAGE_EXTENSIONS:
-            # Check if the file has valid GPS data
-            existing_gps = get_gps_from_exif(output_path)
-            
-            # If no valid GPS data and we have JSON metadata, try to get GPS from JSON
-            if not existing_gps and media_file['json_path']:
-                json_gps = get_gps_from_json(media_file['json_path'])
-                
-                # If we found GPS data in the JSON, update the image
-                if json_gps:
-                    if update_image_gps(output_path, json_gps):
-                        result['gps_updated'] = True
-            
-            # Track files without GPS metadata in either EXIF or JSON
-            if not existing_gps:
-                json_gps = None
-                if media_file['json_path']:
-                    json_gps = get_gps_from_json(media_file['json_path'])
-                
-                if not json_gps:
-                    result['no_gps_metadata'] = True
-            
-            # Update description from JSON if available
-            if media_file['json_path']:
-                description = get_description_from_json(media_file['json_path'])
-                if description:
-                    if update_image_description(output_path, description):
-                        result['description_updated'] = True
+                # Keep what was applied so the summary can show a sample without
+                # reading the JSON again
+                result['time_taken'] = time_taken
+                result['json_path'] = media_file['json_path']
+                result['output_path'] = output_path
+                # Companions are not touched here: each one applies this same timestamp
+                # to itself from companion_json_path, so setting it from both sides
+                # would only repeat the date update
+        
+        # Write the GPS data and description found before the copy in one pass,
+        # unless they were already patched in while copying. A hardlinked output
+        # shares its data with the original, so it is never rewritten
+        if (exif_gps or exif_description) and not exif_written and not linked:
+            exif_written = update_image_metadata(output_path, exif_gps, exif_description)
+        if exif_written:
+            result['gps_updated'] = bool(exif_gps)
+            result['description_updated'] = bool(exif_description)
         
         # Handle files that didn't get their dates updated
         if not date_updated and not media_file['is_companion']:
@@ -1347,10 +1775,11 @@ def process_media_file(media_file: Dict[str, Any], output_dir: str, error_dir: s
             if debug_mode:
                 # Create error directory path
                 error_path = os.path.join(error_dir, rel_path)
-                os.makedirs(os.path.dirname(error_path), exist_ok=True)
+                ensure_dir(os.path.dirname(error_path))
                 
-                # Copy the file to the error directory
-                shutil.copy2(media_file['media_path'], error_path)
+                # Copy the file to the error directory, with the same reflink/CopyFile
+                # fast paths as the output copy (never a hardlink, so it stays untouched)
+                fast_copy(media_file['media_path'], error_path)
                 
                 # Create a debug info file next to the error file
                 debug_info_path = error_path + '.debug.txt'
@@ -1368,7 +1797,7 @@ def process_media_file(media_file: Dict[str, Any], output_dir: str, error_dir: s
                                 f.write("\n\n")
                                 
                                 # Parse the JSON to check for timestamp information
-                                metadata = json.loads(json_content)
+                                metadata = parse_json(json_content)
                                 if 'photoTakenTime' in metadata:
                                     f.write("photoTakenTime found in metadata:\n")
                                     f.write(f"{metadata['photoTakenTime']}\n\n")
@@ -1392,8 +1821,8 @@ def process_media_file(media_file: Dict[str, Any], output_dir: str, error_dir: s
                         f.write("No JSON metadata file found or it doesn't exist.\n")
                         
                         # Try to find JSON files with similar names in the same directory
-                        dir_path = os.path.dirname(media_file['media_path'])
-                        base_name = os.path.splitext(os.path.basename(media_file['media_path']))[0]
+                        dir_path = media_file['dir_path']
+                        base_name = media_file['filename'][:-len(media_file['extension'])]
                         f.write(f"\nSearching for JSON files with similar names in {dir_path}:\n")
                         
                         # List all files in the directory
@@ -1421,27 +1850,34 @@ def process_media_file(media_file: Dict[str, Any], output_dir: str, error_dir: s
         result['error'] = str(e)
         result['success'] = False
         
-        # Move the file to the error directory if there was an error
+        # Move the file to the error directory if there was an error. A rename is
+        # enough when both directories are on the same drive, only fall back to
+        # copying the data across when they are not
         try:
             if os.path.exists(output_path):
                 error_path = os.path.join(error_dir, rel_path)
-                os.makedirs(os.path.dirname(error_path), exist_ok=True)
-                shutil.move(output_path, error_path)
+                ensure_dir(os.path.dirname(error_path))
+                try:
+                    os.replace(output_path, error_path)
+                except OSError as e:
+                    if e.errno != errno.EXDEV:
+                        raise
+                    shutil.move(output_path, error_path)
         except:
             pass
     
     return result
 
 
-def process_file_wrapper(media_file, output_dir, error_dir, input_dir, debug_mode, all_media_files, quiet_mode=False, force_utc=False):
+def process_file_wrapper(media_file, output_dir, error_dir, input_dir, debug_mode, quiet_mode=False, link_files=False):
     """Wrapper function for parallel processing."""
     try:
-        result = process_media_file(media_file, output_dir, error_dir, input_dir, debug_mode, all_media_files, quiet_mode, force_utc)
+        result = process_media_file(media_file, output_dir, error_dir, input_dir, debug_mode, quiet_mode, link_files)
         # Add filename to result for error reporting
         result['filename'] = media_file['filename']
         return result
     except Exception as e:
-        # Handle any exceptions in the worker process
+        # Handle any exceptions in the worker thread
         return {
             'success': False,
             'dates_updated': False,
@@ -1449,34 +1885,54 @@ def process_file_wrapper(media_file, output_dir, error_dir, input_dir, debug_mod
             'filename': media_file['filename']
         }
 
+def process_file_chunk(chunk, output_dir, error_dir, input_dir, debug_mode, quiet_mode=False, link_files=False):
+    """
+    Process a batch of media files in one worker task.
+    Returns the batch's summary counts, its (filename, error) pairs and the first result
+    with a photo taken time, so the main thread merges one Counter per batch.
+    """
+    counts = Counter()
+    errors = []
+    sample_result = None
+    for media_file in chunk:
+        result = process_file_wrapper(media_file, output_dir, error_dir, input_dir, debug_mode, quiet_mode, link_files)
+        if result['success']:
+            counts['success'] += 1
+            counts.update(key for key in RESULT_COUNTERS if result.get(key))
+        else:
+            counts['error'] += 1
+            if result['error']:
+                errors.append((result['filename'], result['error']))
+        if sample_result is None and result.get('time_taken') is not None:
+            sample_result = result
+    return counts, errors, sample_result
+
+
 def main():
     """Main function."""
     # Parse command line arguments
-    input_dir, output_dir, error_dir, debug_mode = parse_arguments()
-    
-    # Re-parse to get the parallel argument, quiet mode, force_utc, and single_file
-    # Fix PowerShell arguments if needed (already done in parse_arguments)
-    parser = argparse.ArgumentParser(description="Fix file dates in Google Takeout exports")
-    parser.add_argument('-i', '--input-dir', required=True)
-    parser.add_argument('-o', '--output-dir', required=True)
-    parser.add_argument('-e', '--error-dir', required=True)
-    parser.add_argument('-p', '--parallel', type=int, default=1)
-    parser.add_argument('-d', '--debug', action='store_true')
-    parser.add_argument('-q', '--quiet', action='store_true')
-    parser.add_argument('-u', '--force-utc', action='store_true')
-    parser.add_argument('-s', '--single-file')
-    args = parser.parse_args()
+    args = parse_arguments()
+    input_dir = args.input_dir
+    output_dir = args.output_dir
+    error_dir = args.error_dir
+    debug_mode = args.debug
     workers = args.parallel
     quiet_mode = args.quiet
     force_utc = args.force_utc
     single_file = args.single_file
+    link_files = args.link
     
     if force_utc:
-        print(f"{Colors.YELLOW}Force UTC mode enabled: All timestamps will be interpreted as UTC{Colors.ENDC}")
+        print(f"{Colors.YELLOW}Force UTC mode enabled: Sample dates will be shown in UTC{Colors.ENDC}")
     
     # Validate directories with debug mode awareness
     validate_directories(input_dir, output_dir, error_dir, debug_mode)
     
+    # Without -p, pick the worker count from the kind of drive the input is on.
+    # A single file is processed on the main thread, so there is nothing to pick
+    if workers <= 0 and not single_file:
+        workers = choose_workers(input_dir)
+    
     # Print debug mode message if enabled
     if debug_mode:
         print(f"{Colors.YELLOW}Debug mode enabled: Files without date updates will be copied to {error_dir}{Colors.ENDC}")
@@ -1491,13 +1947,10 @@ def main():
         if not os.path.exists(single_file_path):
             # Try to find the file in subdirectories
             found = False
-            for root, _, files in os.walk(input_dir):
-                for file in files:
-                    if file == single_file:
-                        single_file_path = os.path.join(root, file)
-                        found = True
-                        break
-                if found:
+            for entry in iter_files(input_dir):
+                if entry.name == single_file:
+                    single_file_path = entry.path
+                    found = True
                     break
             
             if not found:
@@ -1511,31 +1964,20 @@ def main():
         media_file = {
             'media_path': single_file_path,
             'json_path': None,
-            'filename': single_file,
+            'filename': os.path.basename(single_file_path),
             'extension': file_ext,
+            'dir_path': os.path.dirname(single_file_path),
             'is_companion': False,
-            'companion_path': None
+            'companion_path': None,
+            'companion_json_path': None,
+            'dir_image_names': None
         }
         
         # Look for corresponding JSON files with different naming patterns
-        json_path1 = single_file_path + '.json'
-        json_path2 = single_file_path + '.suppl.json'
-        json_path3 = single_file_path + '.supplemental-metadata.json'
-        json_path4 = os.path.splitext(single_file_path)[0] + '.json'
-        
-        # Check each pattern
-        if os.path.exists(json_path1):
-            media_file['json_path'] = json_path1
-            print(f"{Colors.GREEN}Found JSON metadata: {json_path1}{Colors.ENDC}")
-        elif os.path.exists(json_path2):
-            media_file['json_path'] = json_path2
-            print(f"{Colors.GREEN}Found JSON metadata: {json_path2}{Colors.ENDC}")
-        elif os.path.exists(json_path3):
-            media_file['json_path'] = json_path3
-            print(f"{Colors.GREEN}Found JSON metadata: {json_path3}{Colors.ENDC}")
-        elif os.path.exists(json_path4):
-            media_file['json_path'] = json_path4
-            print(f"{Colors.GREEN}Found JSON metadata: {json_path4}{Colors.ENDC}")
+        json_path = find_json_sidecar(single_file_path)
+        if json_path:
+            media_file['json_path'] = json_path
+            print(f"{Colors.GREEN}Found JSON metadata: {json_path}{Colors.ENDC}")
         else:
             print(f"{Colors.YELLOW}No JSON metadata found for {single_file}{Colors.ENDC}")
             
@@ -1559,26 +2001,10 @@ def main():
                 # Check if any of these image files have metadata
                 for img_path in potential_image_files:
                     # Check for JSON metadata for the image file
-                    img_json_path1 = img_path + '.json'
-                    img_json_path2 = img_path + '.suppl.json'
-                    img_json_path3 = img_path + '.supplemental-metadata.json'
-                    img_json_path4 = os.path.splitext(img_path)[0] + '.json'
-                    
-                    if os.path.exists(img_json_path1):
-                        media_file['json_path'] = img_json_path1
-                        print(f"{Colors.GREEN}Found JSON metadata from companion image: {img_json_path1}{Colors.ENDC}")
-                        break
-                    elif os.path.exists(img_json_path2):
-                        media_file['json_path'] = img_json_path2
-                        print(f"{Colors.GREEN}Found JSON metadata from companion image: {img_json_path2}{Colors.ENDC}")
-                        break
-                    elif os.path.exists(img_json_path3):
-                        media_file['json_path'] = img_json_path3
-                        print(f"{Colors.GREEN}Found JSON metadata from companion image: {img_json_path3}{Colors.ENDC}")
-                        break
-                    elif os.path.exists(img_json_path4):
-                        media_file['json_path'] = img_json_path4
-                        print(f"{Colors.GREEN}Found JSON metadata from companion image: {img_json_path4}{Colors.ENDC}")
+                    img_json_path = find_json_sidecar(img_path)
+                    if img_json_path:
+                        media_file['json_path'] = img_json_path
+                        print(f"{Colors.GREEN}Found JSON metadata from companion image: {img_json_path}{Colors.ENDC}")
                         break
                 
                 if not media_file['json_path'] and potential_image_files:
@@ -1599,23 +2025,10 @@ def main():
                     original_path = os.path.join(dir_path, original_name)
                     
                     # Check for JSON files with the original name
-                    json_path5 = original_path + '.json'
-                    json_path6 = original_path + '.suppl.json'
-                    json_path7 = original_path + '.supplemental-metadata.json'
-                    json_path8 = os.path.splitext(original_path)[0] + '.json'
-                    
-                    if os.path.exists(json_path5):
-                        media_file['json_path'] = json_path5
-                        print(f"{Colors.GREEN}Found JSON metadata using original name: {json_path5}{Colors.ENDC}")
-                    elif os.path.exists(json_path6):
-                        media_file['json_path'] = json_path6
-                        print(f"{Colors.GREEN}Found JSON metadata using original name: {json_path6}{Colors.ENDC}")
-                    elif os.path.exists(json_path7):
-                        media_file['json_path'] = json_path7
-                        print(f"{Colors.GREEN}Found JSON metadata using original name: {json_path7}{Colors.ENDC}")
-                    elif os.path.exists(json_path8):
-                        media_file['json_path'] = json_path8
-                        print(f"{Colors.GREEN}Found JSON metadata using original name: {json_path8}{Colors.ENDC}")
+                    json_path = find_json_sidecar(original_path)
+                    if json_path:
+                        media_file['json_path'] = json_path
+                        print(f"{Colors.GREEN}Found JSON metadata using original name: {json_path}{Colors.ENDC}")
         
         # Process the single file with extra debugging
         print(f"{Colors.HEADER}Processing single file with debug mode enabled...{Colors.ENDC}")
@@ -1624,7 +2037,7 @@ def main():
         debug_mode = True
         
         # Process the file
-        result = process_media_file(media_file, output_dir, error_dir, input_dir, debug_mode, [media_file], quiet_mode, force_utc)
+        result = process_media_file(media_file, output_dir, error_dir, input_dir, debug_mode, quiet_mode, link_files)
         
         # Print detailed results
         print(f"\n{Colors.CYAN}=== Processing Results ==={Colors.ENDC}")
@@ -1655,8 +2068,8 @@ def main():
                 # Show the metadata content
                 if media_file['json_path']:
                     try:
-                        with open(media_file['json_path'], 'r', encoding='utf-8') as f:
-                            metadata = json.load(f)
+                        with open(media_file['json_path'], 'rb') as f:
+                            metadata = parse_json(f.read())
                             print(f"\n{Colors.CYAN}JSON Metadata Content:{Colors.ENDC}")
                             
                             # Print key metadata fields
@@ -1668,10 +2081,11 @@ def main():
                                 print(f"modificationTime: {metadata['modificationTime']}")
                             
                             # Print the timestamp that was used
-                            time_taken = read_photo_taken_time(media_file['json_path'], force_utc)
-                            if time_taken:
+                            time_taken = read_photo_taken_ts(media_file['json_path'])
+                            if time_taken is not None:
                                 print(f"\nExtracted timestamp: {Colors.GREEN}{time_taken}{Colors.ENDC}")
-                                dt = datetime.fromisoformat(time_taken)
+                                formatted_time = metadata.get('photoTakenTime', {}).get('formatted', '')
+                                dt = convert_timestamp(time_taken, formatted_time, force_utc)
                                 print(f"Converted to datetime: {Colors.GREEN}{dt}{Colors.ENDC}")
                             else:
                                 print(f"\nExtracted timestamp: {Colors.RED}None{Colors.ENDC}")
@@ -1697,90 +2111,105 @@ def main():
         sys.exit(0)
     
     # Normal processing mode for all files
-    all_media_files = find_media_files(input_dir, debug_mode)
+    directories, total_files = find_media_files(input_dir, workers)
     
     # Process media files
-    print(f"{Colors.HEADER}Processing {len(all_media_files)} media files with {workers} parallel workers...{Colors.ENDC}")
+    print(f"{Colors.HEADER}Processing {total_files} media files with {workers} parallel workers...{Colors.ENDC}")
     
-    # Process files in parallel
-    results = []
+    # Process files in parallel. Only the first result usable as the summary sample is
+    # kept, holding every per-file result dict until the end would grow with the Takeout
+    sample_result = None
     completed = 0
-    success_count = 0
-    error_count = 0
-    dates_updated_count = 0
-    no_metadata_count = 0
-    companion_count = 0
-    gps_updated_count = 0
-    no_gps_metadata_count = 0
-    description_updated_count = 0
-    
-    # Create a dictionary to track companion relationships for post-processing
-    companion_relationships = {}
-    for media_file in all_media_files:
-        if media_file['is_companion'] and media_file['companion_path']:
-            companion_relationships[media_file['media_path']] = media_file['companion_path']
+    totals = Counter()
+    
+    # Track companion relationships for post-processing, filled in as the files are
+    # handed to the workers. Both halves of a Live Photo share a folder, so each pair is
+    # kept as (directory, companion name, primary name), reusing the directory string
+    # every record of that folder already shares instead of two full paths per pair
+    companion_relationships = []
     
     # Initial progress bar
-    print_progress_bar(0, len(all_media_files))
-    
-    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
-        # Submit all tasks
-        futures = {
-            executor.submit(
-                process_file_wrapper, 
-                media_file, 
-                output_dir, 
-                error_dir, 
-                input_dir,
-                debug_mode,
-                all_media_files,
-                quiet_mode,
-                force_utc
-            ): media_file['filename']
-            for media_file in all_media_files
-        }
+    print_progress_bar(0, total_files)
+    
+    # The per-file work is I/O-bound (copy, JSON read, file time update), so threads
+    # avoid the pickling and worker start-up cost of a process pool
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        # Keep a bounded window of tasks in flight instead of queueing every file
+        # up front, so memory stays flat on large Takeouts while the disk stays busy
+        max_in_flight = workers * 2
+        # Hand each task a small batch of files, but keep the batches small enough on
+        # little Takeouts that every worker still gets a share of the files
+        chunk_size = max(1, min(MAX_CHUNK_SIZE, total_files // (workers * 4)))
+        # Each directory's JSON and companion matching runs as its files are pulled into
+        # the window, overlapping with the copies already in flight
+        pending_files = iter_media_files(directories, debug_mode)
+        futures = {}
+        
+        # The directories and flags are the same for every file, so bind them once
+        # and submit only the media file records for each task
+        process_chunk = functools.partial(
+            process_file_chunk,
+            output_dir=output_dir,
+            error_dir=error_dir,
+            input_dir=input_dir,
+            debug_mode=debug_mode,
+            quiet_mode=quiet_mode,
+            link_files=link_files
+        )
         
-        # Process results as they complete
-        for future in concurrent.futures.as_completed(futures):
-            try:
-                result = future.result()
-                results.append(result)
+        def submit_next():
+            chunk = list(itertools.islice(pending_files, chunk_size))
+            if chunk:
+                for media_file in chunk:
+                    if media_file['is_companion'] and media_file['companion_path']:
+                        companion_relationships.append((media_file['dir_path'], media_file['filename'], os.path.basename(media_file['companion_path'])))
+                future = executor.submit(process_chunk, chunk)
+                futures[future] = chunk
+        
+        for _ in range(max_in_flight):
+            submit_next()
+        
+        # Process results as they complete, topping the window back up each time
+        while futures:
+            done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                chunk = futures.pop(future)
+                submit_next()
                 
-                # Update counters
-                completed += 1
-                if result['success']:
-                    success_count += 1
-                    if result.get('dates_updated', False):
-                        dates_updated_count += 1
-                    if result.get('is_companion', False):
-                        companion_count += 1
-                    if result.get('date_not_updated', False):
-                        no_metadata_count += 1  # Reusing this counter for files without date updates
-                    if result.get('gps_updated', False):
-                        gps_updated_count += 1
-                    if result.get('no_gps_metadata', False):
-                        no_gps_metadata_count += 1
-                    if result.get('description_updated', False):
-                        description_updated_count += 1
+                try:
+                    counts, errors, chunk_sample = future.result()
+                except Exception as e:
+                    # process_file_wrapper reports per-file errors itself, so this is the whole task failing
+                    totals['error'] += len(chunk)
+                    for media_file in chunk:
+                        print(f"\n{Colors.RED}Error in worker thread for {media_file['filename']}: {str(e)}{Colors.ENDC}")
                 else:
-                    error_count += 1
-                    if result['error']:
-                        print(f"\n{Colors.RED}Error processing {result['filename']}: {result['error']}{Colors.ENDC}")
+                    # Merge the batch's counts in one step
+                    totals.update(counts)
+                    for filename, error in errors:
+                        print(f"\n{Colors.RED}Error processing {filename}: {error}{Colors.ENDC}")
+                    if sample_result is None:
+                        sample_result = chunk_sample
                 
                 # Update progress bar
-                print_progress_bar(completed, len(all_media_files))
-                
-            except Exception as e:
-                completed += 1
-                error_count += 1
-                filename = futures[future]
-                print(f"\n{Colors.RED}Error in worker process for {filename}: {str(e)}{Colors.ENDC}")
-                print_progress_bar(completed, len(all_media_files))
+                completed += len(chunk)
+                print_progress_bar(completed, total_files)
+    
+    success_count = totals['success']
+    error_count = totals['error']
+    dates_updated_count = totals['dates_updated']
+    companion_count = totals['is_companion']
+    no_metadata_count = totals['date_not_updated']  # Files without date updates
+    gps_updated_count = totals['gps_updated']
+    no_gps_metadata_count = totals['no_gps_metadata']
+    description_updated_count = totals['description_updated']
     
     # Make sure we end with a newline after the progress bar
-    if completed == len(all_media_files):
+    if completed == total_files:
         print()
     
+    print(f"{Colors.BOLD}Identified {len(companion_relationships)} companion files (Apple Live Photos).{Colors.ENDC}")
+    
     # Post-processing step: Ensure all companion files have matching dates
     if companion_relationships and not quiet_mode:
         print(f"\n{Colors.CYAN}=== Post-Processing Live Photos ==={Colors.ENDC}")
@@ -1790,40 +2219,41 @@ def main():
         post_process_updated = 0
         
         # For each companion relationship, ensure both files have the same date
-        for companion_path, primary_path in companion_relationships.items():
+        for dir_path, companion_name, primary_name in companion_relationships:
             # Get the output paths
-            companion_rel_path = os.path.relpath(companion_path, input_dir)
-            primary_rel_path = os.path.relpath(primary_path, input_dir)
-            companion_output_path = os.path.join(output_dir, companion_rel_path)
-            primary_output_path = os.path.join(output_dir, primary_rel_path)
+            output_dir_path = os.path.join(output_dir, relative_dir(dir_path, input_dir))
+            companion_output_path = os.path.join(output_dir_path, companion_name)
+            primary_output_path = os.path.join(output_dir_path, primary_name)
             
-            # Check if both files exist in the output directory
-            if os.path.exists(companion_output_path) and os.path.exists(primary_output_path):
-                # Get the file stats
+            # Get the file stats; a single stat per file also tells whether both files
+            # exist in the output directory, without a separate exists check
+            try:
                 companion_stat = os.stat(companion_output_path)
                 primary_stat = os.stat(primary_output_path)
+            except OSError:
+                continue
+            
+            # Get the modification times
+            companion_mtime = companion_stat.st_mtime
+            primary_mtime = primary_stat.st_mtime
+            
+            # If the times don't match, update the companion file
+            if abs(companion_mtime - primary_mtime) > 1:  # Allow 1 second difference
+                # Use the primary file's time
+                primary_ts = primary_stat.st_mtime_ns // 1_000_000_000
                 
-                # Get the modification times
-                companion_mtime = companion_stat.st_mtime
-                primary_mtime = primary_stat.st_mtime
-                
-                # If the times don't match, update the companion file
-                if abs(companion_mtime - primary_mtime) > 1:  # Allow 1 second difference
-                    # Use the primary file's time
-                    primary_dt = datetime.fromtimestamp(primary_mtime)
-                    
-                    # Update the companion file's date
-                    if update_file_dates(companion_output_path, primary_dt.isoformat(), quiet_mode, debug_mode):
-                        post_process_updated += 1
-                        if debug_mode:
-                            print(f"{Colors.GREEN}Updated companion file date in post-processing: {os.path.basename(companion_output_path)}{Colors.ENDC}")
+                # Update the companion file's date
+                if update_file_dates(companion_output_path, primary_ts, quiet_mode, debug_mode):
+                    post_process_updated += 1
+                    if debug_mode:
+                        print(f"{Colors.GREEN}Updated companion file date in post-processing: {os.path.basename(companion_output_path)}{Colors.ENDC}")
         
         print(f"{Colors.GREEN}Updated {post_process_updated} companion files in post-processing{Colors.ENDC}")
         print(f"{Colors.CYAN}=============================={Colors.ENDC}")
     
     # Print summary
     print(f"\n{Colors.YELLOW}=== Processing Complete ==={Colors.ENDC}")
-    print(f"{Colors.BOLD}Total files processed:{Colors.ENDC} {len(all_media_files)}")
+    print(f"{Colors.BOLD}Total files processed:{Colors.ENDC} {total_files}")
     print(f"{Colors.GREEN}Successfully processed:{Colors.ENDC} {success_count}")
     print(f"{Colors.BLUE}Files with dates updated:{Colors.ENDC} {dates_updated_count}")
     print(f"{Colors.CYAN}Companion files (Live Photos):{Colors.ENDC} {companion_count}")
@@ -1844,25 +2274,19 @@ def main():
     # Print a summary of file dates for a sample file
     if dates_updated_count > 0:
         print(f"\n{Colors.CYAN}=== Sample File Date Summary ==={Colors.ENDC}")
-        # Find a file that had its dates updated
+        # Use the first file that had its dates updated from its own metadata
         sample_file = None
         sample_json = None
         sample_time = None
         
-        for media_file in all_media_files:
-            if media_file['json_path'] and os.path.exists(media_file['json_path']):
-                rel_path = os.path.relpath(media_file['media_path'], input_dir)
-                output_path = os.path.join(output_dir, rel_path)
-                
-                if os.path.exists(output_path):
-                    sample_file = output_path
-                    sample_json = media_file['json_path']
-                    sample_time = read_photo_taken_time(media_file['json_path'])
-                    break
+        if sample_result:
+            sample_file = sample_result['output_path']
+            sample_json = sample_result['json_path']
+            sample_time = sample_result['time_taken']
         
         if sample_file and sample_time:
-            # Convert ISO format to datetime
-            expected_date = datetime.fromisoformat(sample_time)
+            # Show the expected date in local time, like the file dates below
+            expected_date = datetime.fromtimestamp(sample_time)
             
             # Get the file's creation and modification times
             file_stat = os.stat(sample_file)
@@ -1900,13 +2324,13 @@ def analyze_error_directory(error_dir: str) -> None:
     debug_files = []
     
     # Walk through the error directory
-    for root, _, files in os.walk(error_dir):
-        for file in files:
-            file_path = os.path.join(root, file)
-            if file.endswith('.debug.txt'):
-                debug_files.append(file_path)
-            else:
-                error_files.append(file_path)
+    for entry in iter_files(error_dir):
+        if entry.name.endswith('.debug.txt'):
+            debug_files.append(entry.path)
+        else:
+            error_files.append(entry.path)
+    # Show the examples below in path order, whatever order the directories were listed in
+    debug_files.sort()
     
     print(f"{Colors.BOLD}Found {len(error_files)} files in error directory with {len(debug_files)} debug info files.{Colors.ENDC}")
     
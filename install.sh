@@ -139,10 +139,12 @@ echo "Examples:"
 echo "  $PYTHON_CMD google-fix.py -i \"~/Takeout 10gb Feb 12\" -o \"~/complete/take 14\" -e \"~/error\""
 echo "  $PYTHON_CMD google-fix.py -i \"~/Takeout 10gb Feb 12\" -o \"~/complete/take 14\" -e \"~/error\" -p 4"
 echo
-echo "Note: By default, the tool will use 1 thread for processing. If you have an SSD or NVMe drive,"
-echo "      you can increase the thread count (-p flag) for faster processing. For example:"
-echo "      -p 4 for a quad-core system with an SSD"
-echo "      -p 8 for an octa-core system with an NVMe drive"
+echo "Note: By default, the tool will use 4 threads per CPU core (up to 32) for processing,"
+echo "      or 4 threads when Linux reports the input drive as a spinning HDD."
+echo "      If your photos are on a slow HDD or network drive, you can lower the thread count"
+echo "      (-p flag) to avoid thrashing the disk. For example:"
+echo "      -p 4 for a spinning HDD or a single SSD"
+echo "      -p 1 for a slow network drive"
 echo
 
 # Make the script executable
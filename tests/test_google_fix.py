@@ -0,0 +1,231 @@
+import errno
+import importlib.util
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'google-fix.py')
+
+# google-fix.py is a script, not an importable module name, so load it by path
+_spec = importlib.util.spec_from_file_location('google_fix', SCRIPT_PATH)
+google_fix = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(google_fix)
+
+
+def case_insensitive_exists(path):
+    """os.path.exists as it behaves on a case-insensitive file system (APFS, HFS+, NTFS)."""
+    dir_path, name = os.path.split(path)
+    try:
+        return name.lower() in {entry.lower() for entry in os.listdir(dir_path)}
+    except OSError:
+        return False
+
+
+class MatchMediaFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def touch(self, name, data=b''):
+        with open(os.path.join(self.tmp.name, name), 'wb') as f:
+            f.write(data)
+
+    def match(self):
+        entries = list(os.scandir(self.tmp.name))
+        records = google_fix.match_media_files(self.tmp.name, entries)
+        return {record['filename']: record for record in records}
+
+    def test_mixed_case_sidecar_found_on_case_insensitive_fs(self):
+        self.touch('IMG_0001.JPG')
+        self.touch('img_0001.jpg.json', b'{}')
+        with mock.patch('os.path.exists', case_insensitive_exists):
+            records = self.match()
+        self.assertEqual(
+            os.path.normcase(records['IMG_0001.JPG']['json_path']),
+            os.path.normcase(os.path.join(self.tmp.name, 'IMG_0001.JPG.json'))
+        )
+
+    def test_mixed_case_sidecar_follows_fs_case_rules(self):
+        self.touch('IMG_0001.JPG')
+        self.touch('img_0001.jpg.json', b'{}')
+        records = self.match()
+        expected = os.path.join(self.tmp.name, 'IMG_0001.JPG.json')
+        # Found exactly when the file system itself would open it under that name
+        self.assertEqual(records['IMG_0001.JPG']['json_path'] is not None, os.path.exists(expected))
+
+    def test_exact_case_sidecar(self):
+        self.touch('IMG_0002.jpg')
+        self.touch('IMG_0002.jpg.json', b'{}')
+        records = self.match()
+        self.assertEqual(records['IMG_0002.jpg']['json_path'], os.path.join(self.tmp.name, 'IMG_0002.jpg.json'))
+
+
+def make_jpeg(path, thumbnail=True):
+    """Write a small JFIF JPEG with an Exif segment (and an embedded thumbnail)."""
+    import io
+    import piexif
+    from PIL import Image
+    exif_dict = {'0th': {piexif.ImageIFD.Make: b'Camera'}, 'Exif': {}, 'GPS': {}}
+    if thumbnail:
+        thumb = io.BytesIO()
+        Image.new('RGB', (16, 16), 'red').save(thumb, 'JPEG')
+        exif_dict['1st'] = {piexif.ImageIFD.JPEGInterchangeFormat: 0}
+        exif_dict['thumbnail'] = thumb.getvalue()
+    Image.new('RGB', (64, 64), 'blue').save(path, 'JPEG', exif=piexif.dump(exif_dict))
+
+
+def jpeg_segments(data):
+    """Return (marker, offset, payload) for each segment before the image data of a JPEG."""
+    segments = []
+    pos = 2
+    while data[pos + 1] != 0xDA:
+        length = int.from_bytes(data[pos + 2:pos + 4], 'big')
+        segments.append((data[pos + 1], pos, data[pos + 4:pos + 2 + length]))
+        pos += 2 + length
+    segments.append((0xDA, pos, b''))
+    return segments
+
+
+def image_data(data):
+    """Return a JPEG's bytes from the start of scan marker on."""
+    return data[jpeg_segments(data)[-1][1]:]
+
+
+def exif_segments(data):
+    return [payload for marker, _, payload in jpeg_segments(data) if marker == 0xE1 and payload.startswith(b'Exif\x00\x00')]
+
+
+@unittest.skipUnless(google_fix.HAS_PIL and google_fix.HAS_PIEXIF, 'Pillow and piexif are not installed')
+class PatchJpegExifTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.src = os.path.join(self.tmp.name, 'src.jpg')
+        make_jpeg(self.src)
+        with open(self.src, 'rb') as f:
+            self.original = f.read()
+
+    def assert_patched(self, path):
+        import piexif
+        with open(path, 'rb') as f:
+            data = f.read()
+        self.assertEqual(data[:4], b'\xff\xd8\xff\xe0')
+        self.assertEqual(data[6:11], b'JFIF\x00')
+        self.assertEqual(len(exif_segments(data)), 1)
+        # The image data after the header segments is untouched
+        self.assertEqual(image_data(data), image_data(self.original))
+        exif_dict = piexif.load(data)
+        self.assertEqual(exif_dict['0th'][piexif.ImageIFD.ImageDescription], b'Beach day')
+        self.assertEqual(exif_dict['0th'][piexif.ImageIFD.Make], b'Camera')
+        self.assertTrue(exif_dict['thumbnail'])
+
+    def test_patch_in_place_keeps_jfif_and_one_exif(self):
+        self.assertTrue(google_fix.patch_jpeg_exif(self.src, gps_coords=(1.5, 2.5), description='Beach day'))
+        self.assert_patched(self.src)
+
+    def test_copy_and_patch_keeps_jfif_and_one_exif(self):
+        dst = os.path.join(self.tmp.name, 'dst.jpg')
+        self.assertTrue(google_fix.copy_and_patch_jpeg(self.src, dst, description='Beach day'))
+        self.assert_patched(dst)
+
+    def test_duplicate_exif_segments_are_merged(self):
+        segments = jpeg_segments(self.original)
+        start = next(offset for marker, offset, _ in segments if marker == 0xE1)
+        exif_segment = self.original[start:start + 2 + int.from_bytes(self.original[start + 2:start + 4], 'big')]
+        sos = segments[-1][1]
+        # A second Exif segment late in the header, where piexif.insert would not look
+        with open(self.src, 'wb') as f:
+            f.write(self.original[:sos] + exif_segment + self.original[sos:])
+        self.assertTrue(google_fix.patch_jpeg_exif(self.src, description='Beach day'))
+        self.assert_patched(self.src)
+
+    def test_exif_added_after_jfif_header(self):
+        from PIL import Image
+        Image.new('RGB', (64, 64), 'blue').save(self.src, 'JPEG')
+        with open(self.src, 'rb') as f:
+            self.original = f.read()
+        self.assertEqual(exif_segments(self.original), [])
+        self.assertTrue(google_fix.patch_jpeg_exif(self.src, description='Beach day'))
+        with open(self.src, 'rb') as f:
+            data = f.read()
+        self.assertEqual(data[:4], b'\xff\xd8\xff\xe0')
+        self.assertEqual([marker for marker, _, _ in jpeg_segments(data)][:2], [0xE0, 0xE1])
+        self.assertEqual(len(exif_segments(data)), 1)
+
+
+class UpdateImageMetadataTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    @unittest.skipUnless(google_fix.HAS_PIL, 'Pillow is not installed')
+    def test_no_writer_is_not_counted_as_written(self):
+        path = os.path.join(self.tmp.name, 'image.png')
+        with open(path, 'wb') as f:
+            f.write(b'png')
+        with mock.patch.object(google_fix, 'EXIFTOOL_PATH', None):
+            self.assertFalse(google_fix.update_image_metadata(path, gps_coords=(1.5, 2.5)))
+
+    @unittest.skipUnless(google_fix.HAS_PIL and google_fix.HAS_PIEXIF, 'Pillow and piexif are not installed')
+    def test_exiftool_that_fails_to_start_falls_back_to_piexif(self):
+        path = os.path.join(self.tmp.name, 'image.jpg')
+        make_jpeg(path)
+        with mock.patch.object(google_fix, 'EXIFTOOL_PATH', os.path.join(self.tmp.name, 'missing-exiftool')):
+            self.assertTrue(google_fix.update_image_metadata(path, description='Beach day'))
+        import piexif
+        self.assertEqual(piexif.load(path)['0th'][piexif.ImageIFD.ImageDescription], b'Beach day')
+
+
+class FastCopyTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.src = os.path.join(tmp.name, 'src.mp4')
+        self.dst = os.path.join(tmp.name, 'dst.mp4')
+        with open(self.src, 'wb') as f:
+            f.write(b'video' * 1000)
+
+    @unittest.skipUnless(hasattr(os, 'copy_file_range'), 'os.copy_file_range is not available')
+    def test_rejected_copy_only_disables_that_device_pair(self):
+        def cross_device(*args):
+            raise OSError(errno.EXDEV, 'Invalid cross-device link')
+
+        with mock.patch.object(google_fix, '_reflink_supported', False), \
+                mock.patch.object(google_fix, '_copy_file_range_unsupported_devices', set()), \
+                mock.patch('os.copy_file_range', cross_device):
+            google_fix.fast_copy(self.src, self.dst)
+            self.assertTrue(google_fix._copy_file_range_supported)
+            device = os.stat(self.src).st_dev
+            self.assertEqual(google_fix._copy_file_range_unsupported_devices, {(device, device)})
+
+        with open(self.dst, 'rb') as f:
+            self.assertEqual(f.read(), b'video' * 1000)
+
+
+class ProcessMediaFileTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.input_dir = os.path.join(tmp.name, 'in')
+        self.output_dir = os.path.join(tmp.name, 'out')
+        self.error_dir = os.path.join(tmp.name, 'err')
+        os.makedirs(self.input_dir)
+
+    def test_epoch_zero_timestamp_is_applied(self):
+        with open(os.path.join(self.input_dir, 'VID_0001.mp4'), 'wb') as f:
+            f.write(b'video')
+        with open(os.path.join(self.input_dir, 'VID_0001.mp4.json'), 'w') as f:
+            f.write('{"photoTakenTime": {"timestamp": "0", "formatted": "Jan 1, 1970, 12:00:00 AM UTC"}}')
+        media_file, = google_fix.match_media_files(self.input_dir, list(os.scandir(self.input_dir)))
+
+        result = google_fix.process_media_file(media_file, self.output_dir, self.error_dir, self.input_dir, debug_mode=True, quiet_mode=True)
+
+        self.assertTrue(result['dates_updated'])
+        self.assertFalse(result['date_not_updated'])
+        self.assertEqual(os.stat(os.path.join(self.output_dir, 'VID_0001.mp4')).st_mtime, 0)
+        self.assertFalse(os.path.exists(self.error_dir) and os.listdir(self.error_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()